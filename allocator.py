@@ -0,0 +1,139 @@
+"""Capacity allocation for tables and rooms."""
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def cheapest_cover(resources: Sequence[Any], guest_count: int) -> List[Any]:
+    """
+    Return the cheapest subset of resources whose total capacity seats guest_count.
+
+    resources are rows with "capacity" and "price" keys (sqlite rows or dicts).
+    Ties on price go to the fewest units, then the fewest wasted seats.
+    Returns [] when the guests cannot be seated at all.
+
+    This is a 0/1 knapsack over total capacity. Only capacities below
+    guest_count are extended, and none above guest_count + max capacity - 1
+    are kept, so the runtime is O(len(resources) * (guest_count + max capacity))
+    whatever the number of combinations.
+    """
+    if guest_count <= 0:
+        return []
+    items = [(i, int(r["capacity"]), float(r["price"] or 0)) for i, r in enumerate(resources) if r["capacity"] and r["capacity"] > 0]
+    if not items or sum(cap for _, cap, _ in items) < guest_count:
+        return []
+
+    bound = guest_count + max(cap for _, cap, _ in items) - 1
+    # best[c] = (cost, units, bitmask of chosen indices) for exactly c seats
+    best: List[Any] = [None] * (bound + 1)
+    best[0] = (0.0, 0, 0)
+    for i, cap, price in items:
+        bit = 1 << i
+        for c in range(min(guest_count - 1, bound - cap), -1, -1):
+            cur = best[c]
+            if cur is None:
+                continue
+            cost, units = round(cur[0] + price, 2), cur[1] + 1
+            old = best[c + cap]
+            if old is None or (cost, units) < (old[0], old[1]):
+                best[c + cap] = (cost, units, cur[2] | bit)
+
+    options = [(best[c][0], best[c][1], c - guest_count, best[c][2]) for c in range(guest_count, bound + 1) if best[c]]
+    if not options:
+        return []
+    mask = min(options)[3]
+    return [r for i, r in enumerate(resources) if mask >> i & 1]
+
+
+def allocate_parties(resources: Sequence[Any], guest_counts: Sequence[int]) -> List[List[Any]]:
+    """
+    Seat several parties at once from one pool, giving each a disjoint set.
+
+    One joint search: the assignment that seats the most parties wins, then
+    the cheapest, then the fewest units and wasted seats. Parties are
+    branched on largest first, each over every minimal cover of what is
+    still free (plus leaving it unseated), so a party that only fits if an
+    earlier one takes a dearer cover still gets seated. Resources with the
+    same capacity and price are interchangeable, so covers are built from
+    per-kind counts and the best completion of each (party, free counts)
+    state is memoised. The result is in the same order as guest_counts; a
+    party that cannot be seated gets [].
+    """
+    kinds: Dict[Tuple[int, float], List[Any]] = {}
+    for r in resources:
+        if r["capacity"] and r["capacity"] > 0:
+            kinds.setdefault((int(r["capacity"]), float(r["price"] or 0)), []).append(r)
+    keys = list(kinds)
+    caps = [cap for cap, _ in keys]
+    prices = [price for _, price in keys]
+    order = sorted((i for i, g in enumerate(guest_counts) if g > 0), key=lambda i: -guest_counts[i])
+
+    def covers(free: Tuple[int, ...], guests: int) -> List[Tuple[int, ...]]:
+        """Per-kind counts of every cover of guests that has no unit to spare."""
+        found: List[Tuple[int, ...]] = []
+        take = [0] * len(keys)
+
+        def walk(k: int, seats: int) -> None:
+            if seats >= guests:
+                if seats - min(caps[j] for j in range(len(keys)) if take[j]) < guests:
+                    found.append(tuple(take))
+                return
+            if k == len(keys):
+                return
+            for n in range(free[k] + 1):
+                take[k] = n
+                walk(k + 1, seats + n * caps[k])
+                if seats + n * caps[k] >= guests:
+                    break
+            take[k] = 0
+
+        walk(0, 0)
+        return found
+
+    # lower bounds for parties order[pos:]: each one alone with the whole pool
+    floor = []
+    for i in order:
+        alone = cheapest_cover(resources, guest_counts[i])
+        floor.append((0, sum(float(r["price"] or 0) for r in alone)) if alone else (1, 0.0))
+    floor_unseated = [sum(u for u, _ in floor[pos:]) for pos in range(len(order) + 1)]
+    floor_cost = [sum(c for _, c in floor[pos:]) for pos in range(len(order) + 1)]
+
+    memo: Dict[Tuple[int, Tuple[int, ...]], Tuple[Tuple[int, float, int, int], Tuple[Any, ...]]] = {}
+
+    def best(pos: int, free: Tuple[int, ...]) -> Tuple[Tuple[int, float, int, int], Tuple[Any, ...]]:
+        # (unseated, cost, units, waste) for parties order[pos:], and their per-kind takes
+        if pos == len(order):
+            return (0, 0.0, 0, 0), ()
+        if (pos, free) in memo:
+            return memo[pos, free]
+        guests = guest_counts[order[pos]]
+        result = None
+        options = sorted((sum(t * p for t, p in zip(take, prices)), take) for take in covers(free, guests))
+        for price, take in options:
+            # cheapest first: once even the floor of the rest cannot win, nothing later can
+            if result and (floor_unseated[pos + 1], price + floor_cost[pos + 1]) > result[0][:2]:
+                break
+            (unseated, cost, units, waste), rest = best(pos + 1, tuple(f - t for f, t in zip(free, take)))
+            key = (
+                unseated,
+                round(cost + price, 2),
+                units + sum(take),
+                waste + sum(t * c for t, c in zip(take, caps)) - guests,
+            )
+            if result is None or key < result[0]:
+                result = (key, (take,) + rest)
+        if result is None or result[0][0] > floor_unseated[pos + 1]:
+            (unseated, cost, units, waste), rest = best(pos + 1, free)
+            key = (unseated + 1, cost, units, waste)
+            if result is None or key < result[0]:
+                result = (key, (None,) + rest)
+        memo[pos, free] = result
+        return result
+
+    _, takes = best(0, tuple(len(kinds[k]) for k in keys))
+    pools = {k: list(kinds[k]) for k in keys}
+    position = {id(r): n for n, r in enumerate(resources)}
+    result: List[List[Any]] = [[] for _ in guest_counts]
+    for i, take in zip(order, takes):
+        if take is not None:
+            chosen = [pools[k].pop(0) for k, n in zip(keys, take) for _ in range(n)]
+            result[i] = sorted(chosen, key=lambda r: position[id(r)])
+    return result
@@ -0,0 +1,120 @@
+"""
+Login support: password checks, a failed-attempt throttle and in-memory sessions.
+
+Verifying a password is deliberately expensive, so LoginWindow runs
+authenticate() on a TaskExecutor worker and asks LoginThrottle before each
+attempt; repeated guesses back off instead of keeping a core busy hashing.
+A successful login issues a Session whose token MainApp keeps, so later
+privileged actions check the token rather than the password.
+"""
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import utils
+from models import find_user, update_password_hash
+
+
+def authenticate(username: str, password: str) -> Tuple[Optional[Any], str]:
+    """
+    (users row, "") when the password matches, else (None, reason). Blocking;
+    run it off the Tk thread. A match whose stored hash parameters differ
+    from utils.HASH_PARAMS is re-hashed with the current ones while the
+    plain password is at hand.
+    """
+    user = find_user(username)
+    if not user:
+        return None, "Unknown user"
+    # rows that predate users.hash_params were all hashed with the legacy settings
+    params = user["hash_params"] or utils.LEGACY_HASH_PARAMS
+    if not utils.verify_password(password, user["salt"], user["password_hash"], params):
+        return None, "Wrong password"
+    if utils.needs_rehash(params):
+        target = utils.HASH_PARAMS
+        salt, pw_hash = utils.hash_password(password, params=target)
+        update_password_hash(user["id"], salt, pw_hash, target)
+    return user, ""
+
+
+class LoginThrottle:
+    """
+    Per-username backoff for failed logins. The first free_attempts failures
+    cost nothing; after that each failure doubles the wait, up to max_delay.
+    """
+
+    def __init__(self, free_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.free_attempts = free_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures: Dict[str, Tuple[int, float]] = {}  # key -> (count, locked until)
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return (username or "").strip().lower()
+
+    def retry_after(self, username: str) -> float:
+        """Seconds to wait before the next attempt for username is allowed (0 when allowed now)."""
+        with self._lock:
+            _, until = self._failures.get(self._key(username), (0, 0.0))
+        return max(0.0, until - self.clock())
+
+    def failure(self, username: str) -> float:
+        """Record a failed attempt; returns the wait it imposes."""
+        key = self._key(username)
+        with self._lock:
+            count = self._failures.get(key, (0, 0.0))[0] + 1
+            over = count - self.free_attempts
+            delay = min(self.max_delay, self.base_delay * 2 ** (over - 1)) if over > 0 else 0.0
+            self._failures[key] = (count, self.clock() + delay)
+        return delay
+
+    def success(self, username: str) -> None:
+        with self._lock:
+            self._failures.pop(self._key(username), None)
+
+
+class Session:
+    __slots__ = ("token", "user_id", "username", "is_admin", "created_at")
+
+    def __init__(self, token: str, user_id: int, username: str, is_admin: bool, created_at: float):
+        self.token = token
+        self.user_id = user_id
+        self.username = username
+        self.is_admin = is_admin
+        self.created_at = created_at
+
+
+class SessionStore:
+    """Tokens for logged-in users; lives only as long as the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+
+    def issue(self, user) -> Session:
+        session = Session(secrets.token_urlsafe(32), user["id"], user["username"],
+                          bool(user["is_admin"]), time.time())
+        with self._lock:
+            self._sessions[session.token] = session
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[Session]:
+        if not token:
+            return None
+        with self._lock:
+            return self._sessions.get(token)
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        session = self.get(token)
+        return bool(session and session.is_admin)
+
+    def revoke(self, token: Optional[str]) -> None:
+        with self._lock:
+            self._sessions.pop(token, None)
+
+
+sessions = SessionStore()
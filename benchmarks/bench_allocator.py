@@ -0,0 +1,62 @@
+"""
+Compare allocator.cheapest_cover with the old greedy + combinations search.
+
+    python benchmarks/bench_allocator.py [n_tables]
+"""
+import random
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from allocator import cheapest_cover  # noqa: E402
+
+
+def legacy_find(rows, guest_count, max_comb=5):
+    """The pre-allocator TableModel.find_tables_for search, minus the DB."""
+    rows = sorted(rows, key=lambda x: (-x["capacity"], x["price"]))
+    selected, total = [], 0
+    for r in rows:
+        if total >= guest_count:
+            break
+        selected.append(r)
+        total += r["capacity"]
+    if total >= guest_count:
+        return selected
+    for sz in range(1, min(max_comb, len(rows)) + 1):
+        for comb in combinations(rows, sz):
+            if sum(r["capacity"] for r in comb) >= guest_count:
+                return list(comb)
+    return []
+
+
+def cost(rows):
+    return sum(r["price"] for r in rows)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    rnd = random.Random(1)
+    kinds = [(5, 300), (10, 800), (6, 450), (8, 500)]
+    rows = [dict(id=i, capacity=cap, price=price) for i, (cap, price) in enumerate(rnd.choice(kinds) for _ in range(n))]
+    parties = [rnd.randint(1, 60) for _ in range(500)]
+
+    for name, fn in (("greedy+combinations", legacy_find), ("cheapest_cover", cheapest_cover)):
+        start = time.perf_counter()
+        total = sum(cost(fn(rows, g)) for g in parties)
+        elapsed = time.perf_counter() - start
+        print(f"{name:22s} {n} tables  {len(parties)} parties  {elapsed * 1000:8.1f} ms  total fees {total:,.0f}")
+
+    # a party that cannot be seated makes the old search walk every combination
+    too_big = sum(r["capacity"] for r in rows) + 1
+    for name, fn in (("greedy+combinations", legacy_find), ("cheapest_cover", cheapest_cover)):
+        start = time.perf_counter()
+        fn(rows, too_big)
+        elapsed = time.perf_counter() - start
+        print(f"{name:22s} {n} tables  unseatable party  {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
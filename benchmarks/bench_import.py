@@ -0,0 +1,76 @@
+"""
+Time database.import_bookings_csv on a generated CSV against a scratch
+database, then database.export_bookings of the result (plain and gzip).
+
+    python benchmarks/bench_import.py [n_rows] [chunk_size] [--live-indexes]
+
+By default secondary indexes are deferred (rebuilt after the load), as for a
+season migration; --live-indexes keeps them maintained row by row.
+"""
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+
+FIRST = ["Ana", "Ben", "Carla", "Dan", "Elena", "Franco", "Gina", "Hector", "Ivy", "Joanne"]
+LAST = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores"]
+PACKAGES = ["Day Tour", "Overnight", "Complete Stay"]
+
+
+def write_csv(path, n, seed=7):
+    rnd = random.Random(seed)
+    start = date(2015, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(database.BOOKING_CSV_COLUMNS)
+        for i in range(n):
+            adults, children = rnd.randint(1, 6), rnd.randint(0, 4)
+            w.writerow([
+                i + 1,
+                f"{rnd.choice(FIRST)} {rnd.choice(LAST)}",
+                (start + timedelta(days=rnd.randrange(3650))).isoformat(),
+                adults,
+                children,
+                adults + children,
+                rnd.choice(PACKAGES),
+                rnd.randint(1, 10),
+                rnd.choice(["", str(rnd.randint(1, 6))]),
+                1500,
+                1500,
+                rnd.choice(["checked-out", "checked-out", "cancelled"]),
+            ])
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    defer = "--live-indexes" not in sys.argv
+    n = int(args[0]) if args else 1_000_000
+    chunk = int(args[1]) if len(args) > 1 else database.IMPORT_CHUNK_SIZE
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "bookings.csv"
+        t0 = time.perf_counter()
+        write_csv(src, n)
+        print(f"generated {n} rows in {time.perf_counter() - t0:.1f}s")
+
+        database.DB_PATH = Path(tmp) / "bench.db"
+        database.init_db()
+        report = database.import_bookings_csv(str(src), chunk_size=chunk, defer_indexes=defer)
+        print(f"imported {report['imported']} rows in {report['seconds']:.1f}s "
+              f"({report['rows_per_sec']:,.0f} rows/s, chunk {chunk}, "
+              f"{'deferred' if defer else 'live'} indexes, {len(report['errors'])} errors)")
+
+        for name in ("export.csv", "export.csv.gz"):
+            out = database.export_bookings(str(Path(tmp) / name))
+            print(f"exported {out['rows']} rows to {name} in {out['seconds']:.1f}s ({out['rows_per_sec']:,.0f} rows/s)")
+        database.close_pool()
+
+
+if __name__ == "__main__":
+    main()
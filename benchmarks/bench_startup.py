@@ -0,0 +1,58 @@
+"""
+Time from interpreter start to a drawn login window, in a fresh process per run.
+
+    python benchmarks/bench_startup.py [runs]
+
+Also lists which heavy graph/report modules were already imported when the
+login window appeared (there should be none). Without a display only the
+import phase is measured.
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("matplotlib", "numpy", "pandas", "PIL")
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import views
+t_import = time.perf_counter() - t0
+t_window = None
+try:
+    win = views.LoginWindow()
+    win.update()
+    t_window = time.perf_counter() - t0
+    win.destroy()
+except Exception as e:
+    print(f"no window: {e}", file=sys.stderr)
+heavy = sorted(m for m in HEAVY if m in sys.modules)
+print(json.dumps({"import": t_import, "window": t_window, "heavy": heavy}))
+"""
+
+
+def run_once():
+    code = f"HEAVY = {HEAVY!r}\n" + CHILD
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+    imports = [r["import"] for r in results]
+    print(f"import views      median {statistics.median(imports) * 1000:8.1f} ms  ({runs} runs)")
+    windows = [r["window"] for r in results if r["window"] is not None]
+    if windows:
+        print(f"login window up   median {statistics.median(windows) * 1000:8.1f} ms")
+    else:
+        print("login window up   (no display; import time only)")
+    heavy = results[-1]["heavy"]
+    print(f"heavy modules loaded before login: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
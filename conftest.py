@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import pytest
+
+import controllers
+from models import BookingModel
+
+
+@pytest.fixture
+def book():
+    """Factory for zero-fee bookings: book("2025-01-01", table_id=[1, 2], package="Overnight")."""
+    def create(date, package="Day Tour", table_id=None, room_id=None, name=None, adults=2, children=0):
+        BookingModel.create(
+            guest_name=name or f"{package} Guest",
+            booking_date=date,
+            adults=adults,
+            children=children,
+            package=package,
+            table_id=table_id,
+            room_id=room_id,
+            table_fee=0.0,
+            room_fee=0.0,
+            entrance_fee=0.0,
+            total_amount=0.0,
+            amount_paid=0.0,
+        )
+    return create
+
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Call frozen_now(datetime(...)) to pin datetime.now() as seen by controllers."""
+    def freeze(fixed_now):
+        class FrozenDateTime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return fixed_now
+
+        monkeypatch.setattr(controllers, "datetime", FrozenDateTime)
+    return freeze
@@ -1,10 +1,19 @@
-from models import TableModel, RoomModel, BookingModel, is_table_booked, is_room_booked
+from models import TableModel, RoomModel, BookingModel, availability_map
+from allocator import allocate_parties
 import database as db
-from datetime import datetime, date, time, timedelta
+import threading
+from datetime import datetime, date
 
 ADULT_ENTRANCE = 150.0
 CHILD_ENTRANCE = 130.0
 
+REPORT_PAGE_SIZE = 500
+
+# AdminView filter modes
+CURRENT_GUESTS = "Current Guests"
+TODAYS_ARRIVALS = "Today's Arrivals"
+ALL_HISTORY = "All History"
+
 
 class BookingController:
     def suggest_table(self, adults: int, children: int, date: str = None):
@@ -37,16 +46,58 @@ class BookingController:
             total = (entrance_fee or 0) + t_fee + r_fee
         return total, entrance_fee
 
+    def allocate_parties(self, parties, date):
+        """
+        Assign disjoint tables / rooms to several parties arriving together.
+
+        parties: list of dicts with "adults", "children" and "package".
+        Day Tour parties get tables, Overnight / Complete Stay parties get
+        rooms. Availability is read once for the whole batch. Returns one
+        dict per party, in input order, with the chosen rows, fees and an
+        "ok" flag that is False when the party could not be placed.
+        """
+        booked = availability_map(date)
+        free_tables = TableModel.free_for(date, booked["tables"])
+        free_rooms = RoomModel.free_for(date, booked["rooms"])
+
+        guests = [(p.get("adults") or 0) + (p.get("children") or 0) for p in parties]
+        day_idx = [i for i, p in enumerate(parties) if p.get("package", "Day Tour") == "Day Tour"]
+        stay_idx = [i for i, p in enumerate(parties) if p.get("package", "Day Tour") != "Day Tour"]
+        tables = dict(zip(day_idx, allocate_parties(free_tables, [guests[i] for i in day_idx])))
+        rooms = dict(zip(stay_idx, allocate_parties(free_rooms, [guests[i] for i in stay_idx])))
+
+        result = []
+        for i, p in enumerate(parties):
+            t_rows, r_rows = tables.get(i, []), rooms.get(i, [])
+            table_fee = sum(float(t["price"]) for t in t_rows)
+            room_fee = sum(float(r["price"]) for r in r_rows)
+            entrance = self.calculate_entrance(p.get("adults"), p.get("children"))
+            total, _ = self.calculate_total(p.get("adults"), p.get("children"), entrance, table_fee, room_fee,
+                                            p.get("package", "Day Tour"))
+            result.append({
+                "party": p,
+                "guests": guests[i],
+                "tables": t_rows,
+                "rooms": r_rows,
+                "table_fee": table_fee,
+                "room_fee": room_fee,
+                "entrance_fee": entrance,
+                "total": total,
+                "ok": bool(t_rows or r_rows) or guests[i] == 0,
+            })
+        return result
+
     def validate_availability(self, date, table_ids, room_ids):
         """Return (ok:bool, msg:str). Accepts lists or None."""
-        if table_ids:
-            for tid in table_ids:
-                if is_table_booked(tid, date):
-                    return False, f"Table {tid} is already booked for {date}"
-        if room_ids:
-            for rid in room_ids:
-                if is_room_booked(rid, date):
-                    return False, f"Room {rid} is already booked for {date}"
+        if not table_ids and not room_ids:
+            return True, "OK"
+        booked = availability_map(date)
+        for tid in table_ids or []:
+            if int(tid) in booked["tables"]:
+                return False, f"Table {tid} is already booked for {date}"
+        for rid in room_ids or []:
+            if int(rid) in booked["rooms"]:
+                return False, f"Room {rid} is already booked for {date}"
         return True, "OK"
 
     def create_booking(
@@ -87,6 +138,12 @@ class BookingController:
 
 
 class AdminController:
+    # (mode, bookings version) -> (labels, guests); shared by every admin view
+    # so reopening the graph does not re-query until bookings change.
+    # Views fill it from executor threads, so every access holds the lock.
+    _summary_cache = {}
+    _summary_lock = threading.Lock()
+
     def report_for_date(self, date_str):
         return BookingModel.fetch_by_date(date_str)
 
@@ -94,8 +151,55 @@ class AdminController:
         return BookingModel.fetch_range(dfrom, dto)
 
     def report_all(self):
-        # expose whole range
-        return BookingModel.fetch_range("0000-01-01", "9999-12-31")
+        # expose whole range; kept for callers that want a list
+        return list(self.iter_report())
+
+    def iter_report(self, dfrom="0000-01-01", dto="9999-12-31", page_size=REPORT_PAGE_SIZE):
+        """Stream bookings in (booking_date, id) order without loading them all."""
+        return BookingModel.iter_range(dfrom, dto, page_size)
+
+    def report_page(self, after=None, limit=REPORT_PAGE_SIZE, dfrom="0000-01-01", dto="9999-12-31"):
+        """
+        One page of the report plus the cursor for the next one
+        (None on the last page): returns (rows, next_after).
+        """
+        rows = BookingModel.fetch_page(dfrom, dto, after, limit)
+        next_after = (rows[-1]["booking_date"], rows[-1]["id"]) if len(rows) == limit else None
+        return rows, next_after
+
+    def search_bookings(self, search_text="", mode=ALL_HISTORY, limit=None):
+        """Bookings for the admin grid, filtered and ordered by the database."""
+        filters = {"search": (search_text or "").strip() or None, "limit": limit}
+        if mode == CURRENT_GUESTS:
+            filters["status"] = "checked-in"
+        elif mode == TODAYS_ARRIVALS:
+            filters["booking_date"] = datetime.now().strftime("%Y-%m-%d")
+        return BookingModel.query(**filters)
+
+    def cached_guest_summary(self, mode="Daily"):
+        """The cached guest_summary for mode if bookings have not changed since, else None."""
+        with self._summary_lock:
+            return self._summary_cache.get((mode, db.bookings_version()))
+
+    def guest_summary(self, mode="Daily"):
+        """(labels, guest totals) per day ("MM-DD") or month ("YYYY-MM") from the rollup tables."""
+        key = (mode, db.bookings_version())
+        with self._summary_lock:
+            cached = self._summary_cache.get(key)
+        if cached is not None:
+            return cached
+        if mode == "Monthly":
+            rows = BookingModel.rollup("month")
+            summary = [r["period"] for r in rows], [r["guests"] for r in rows]
+        else:
+            rows = BookingModel.rollup("day")
+            summary = [r["period"][5:] for r in rows], [r["guests"] for r in rows]
+        with self._summary_lock:
+            cache = AdminController._summary_cache
+            for stale in [k for k in cache if k[1] != key[1]]:
+                del cache[stale]
+            cache[key] = summary
+        return summary
 
     def checkout(self, booking_id):
         BookingModel.checkout(booking_id)
@@ -103,57 +207,27 @@ class AdminController:
     def cancel(self, booking_id):
         BookingModel.cancel(booking_id)
 
-    def export_csv(self, rows, path):
-        BookingModel.export_csv(rows, path)
-
-    def check_auto_checkout(self) -> list[int]:
+    def export_csv(self, path, columns=None, date_from=None, date_to=None, compression="auto"):
         """
-        Identifies and RETURNS a list of IDs for 'Overnight' guests
-        who are past the 8:00 AM cutoff of the day following their booking_date.
+        Stream bookings straight from the database to path (gzip / zstd by
+        .gz / .zst suffix); returns the export stats (rows, rows_per_sec).
         """
-        now = datetime.now()
-        today = now.date()
-
-        # Define the cutoff time (8:00 AM)
-        cutoff_time = time(8, 0, 0)
-        cutoff_dt = datetime.combine(today, cutoff_time)
-
-        # Optimization: only proceed if it's past 8 AM today
-        if now < cutoff_dt:
-            return []
-
-        # --- FIX: Use get_conn() instead of db.query() ---
-        active = []
-        with db.get_conn() as conn:
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, booking_date, package
-                FROM bookings
-                WHERE status = 'checked-in'
-            """)
-            active = c.fetchall()
-        # -------------------------------------------------
-
-        overdue_bookings = []
+        return BookingModel.export(path, columns, date_from, date_to, compression)
 
-        for b in active:
-            try:
-                # b["booking_date"] works because row_factory is sqlite3.Row
-                booking_date = datetime.strptime(b["booking_date"], "%Y-%m-%d").date()
-            except (ValueError, TypeError):
-                continue
+    def import_csv(self, path):
+        """Load bookings from a CSV in the export layout; returns the import report (counts, per-row errors)."""
+        return BookingModel.import_csv(path)
 
-            package = b["package"]
-
-            # Allow both Overnight and Complete Stay
-            if package.lower() in ("overnight", "complete stay"):
-                expected_checkout_date = booking_date + timedelta(days=1)
-                expected_checkout_dt = datetime.combine(expected_checkout_date, cutoff_time)
-
-                if now >= expected_checkout_dt:
-                    overdue_bookings.append(b["id"])
-
-        return overdue_bookings
+    def check_auto_checkout(self, auto_checkout: bool = False) -> list[int]:
+        """
+        Identifies and RETURNS a list of IDs for 'Overnight' / 'Complete Stay'
+        guests who are past the 8:00 AM cutoff of the day following their booking_date.
+        With auto_checkout=True they are also checked out in one batched UPDATE.
+        """
+        now = datetime.now()
+        if auto_checkout:
+            return db.auto_checkout_overdue(now)
+        return db.fetch_overdue_ids(now)
 
     def create_account(self, username, password):
         """
@@ -177,10 +251,11 @@ class AdminController:
             return False, msg
 
         # 4. Hash and Save
-        salt, pw_hash = utils.hash_password(password)
+        params = utils.HASH_PARAMS
+        salt, pw_hash = utils.hash_password(password, params=params)
         try:
             # Creating as admin by default since created from Admin View
-            create_user(username, salt, pw_hash, is_admin=1)
+            create_user(username, salt, pw_hash, is_admin=1, hash_params=params)
             return True, f"Account '{username}' created successfully."
         except Exception as e:
             return False, str(e)
\ No newline at end of file
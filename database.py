@@ -1,27 +1,403 @@
 import sqlite3
+import os
+import re
+from difflib import SequenceMatcher
+import threading
+import time
+import weakref
 from pathlib import Path
 import csv
-from datetime import datetime
+from datetime import datetime, date
 from contextlib import contextmanager
-from typing import Iterable, List, Optional, Any, Dict
+from typing import Iterable, Iterator, List, Optional, Any, Dict, Set, Tuple
 
 DB_PATH = Path(__file__).parent / "resort.db"
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Max idle connections kept per thread for each database file.
+POOL_SIZE = int(os.environ.get("RESORT_DB_POOL_SIZE", "4"))
+
+# Pragmas applied to every new connection. WAL lets the admin dashboard keep
+# reading while a check-in writes; "durable" fsyncs every commit, "fast"
+# trades the last few commits on power loss for far fewer fsyncs.
+STORAGE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8000,  # KiB when negative
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+_PROFILE_ENV = {
+    "cache_size": "RESORT_DB_CACHE_SIZE",
+    "mmap_size": "RESORT_DB_MMAP_SIZE",
+    "temp_store": "RESORT_DB_TEMP_STORE",
+}
+
+
+def _preset(name: str) -> Dict[str, Any]:
+    name = name.lower()
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile {name!r}; expected one of {sorted(STORAGE_PROFILES)}")
+    return dict(STORAGE_PROFILES[name])
+
+
+def _profile_from_env() -> Dict[str, Any]:
+    profile = _preset(os.environ.get("RESORT_DB_PROFILE", "fast"))
+    for key, env in _PROFILE_ENV.items():
+        if os.environ.get(env):
+            val = os.environ[env]
+            profile[key] = int(val) if key != "temp_store" else val.upper()
+    return profile
+
+
+storage_profile: Dict[str, Any] = _profile_from_env()
+
+
+def configure_storage(profile: Optional[str] = None, **overrides) -> Dict[str, Any]:
+    """
+    Select a storage preset ("durable" / "fast") and/or override single pragmas.
+    Pooled connections are retired so the next get_conn() picks it up: idle
+    ones close now, ones borrowed by another thread close when released, so
+    a worker mid-query is not cut off.
+    """
+    global storage_profile
+    base = _preset(profile) if profile else dict(storage_profile)
+    for key in overrides:
+        if key not in base:
+            raise ValueError(f"Unknown storage setting {key!r}")
+    base.update(overrides)
+    storage_profile = base
+    _pool.retire()
+    return dict(storage_profile)
+
+
+def _apply_storage_profile(conn: sqlite3.Connection) -> None:
+    p = storage_profile
+    conn.execute(f"PRAGMA journal_mode={p['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous={p['synchronous']}")
+    conn.execute(f"PRAGMA cache_size={int(p['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size={int(p['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store={p['temp_store']}")
+
+
+class _ThreadIdle:
+    """Marker kept in a thread's slot of ConnectionPool._local; see ConnectionPool._idle."""
+
+
+class ConnectionPool:
+    """
+    Keeps long-lived sqlite3 connections around instead of opening one per call.
+
+    Idle connections are held per thread (sqlite3 objects should stay on the
+    thread that uses them) and keyed by database path, so pointing DB_PATH at
+    another file simply starts a new set of connections. size caps the idle
+    connections of one thread; a thread's idle connections are closed when
+    the thread exits, so worker threads that come and go do not pile them up.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: set = set()
+        self._borrowed: set = set()
+        self._retired: set = set()  # borrowed when retire() ran; closed on release
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _idle(self, path: str) -> list:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = {}
+            # the holder lives only in this thread's slot of self._local, which
+            # Python drops when the thread ends (or when close_all() replaces it)
+            holder = self._local.holder = _ThreadIdle()
+            weakref.finalize(holder, self._close_idle, idle)
+            self._local.idle = idle
+        return idle.setdefault(path, [])
+
+    def _close_idle(self, idle: Dict[str, list]) -> None:
+        for conns in idle.values():
+            for conn in conns:
+                with self._lock:
+                    if conn not in self._open:
+                        continue  # already closed by retire() / close_all()
+                self._discard(conn)
+        idle.clear()
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            path,
+            timeout=5,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False,  # only so close_all() can run from the main thread
+        )
+        conn.row_factory = sqlite3.Row
+        _apply_storage_profile(conn)
+        with self._lock:
+            self._open.add(conn)
+            self._borrowed.add(conn)
+            self.opened += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._open.discard(conn)
+            self._borrowed.discard(conn)
+            self._retired.discard(conn)
+            self.discarded += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self, path: str) -> sqlite3.Connection:
+        idle = self._idle(path)
+        while idle:
+            conn = idle.pop()
+            with self._lock:
+                if conn not in self._open:
+                    continue  # closed by retire() / close_all() while idle
+                self._borrowed.add(conn)
+            if self._healthy(conn):
+                with self._lock:
+                    self.reused += 1
+                return conn
+            self._discard(conn)
+        return self._connect(path)
+
+    def release(self, path: str, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._borrowed.discard(conn)
+            retired = conn in self._retired
+        if retired:
+            self._discard(conn)
+            return
+        # a pooled connection must come back clean, like a closed one would
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        idle = self._idle(path)
+        if len(idle) < self.size:
+            idle.append(conn)
+        else:
+            self._discard(conn)
+
+    def retire(self) -> None:
+        """
+        Stop reusing every current connection: idle ones are closed now,
+        borrowed ones when they are released. Safe while other threads are
+        mid-query.
+        """
+        with self._lock:
+            idle = [conn for conn in self._open if conn not in self._borrowed]
+            self._retired |= self._borrowed
+            self._open -= set(idle)
+            self.discarded += len(idle)
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self) -> None:
+        """
+        Close every connection the pool has opened, on any thread, including
+        borrowed ones; only for shutdown. See retire() otherwise.
+        """
+        with self._lock:
+            conns = list(self._open)
+            self._open.clear()
+            self._borrowed.clear()
+            self._retired.clear()
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # thread-local idle lists on other threads now hold closed connections;
+        # the health check on acquire() discards them.
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "open": len(self._open),
+            }
+
+
+_pool = ConnectionPool()
+
+
+# ----------------------
+# Record types
+# ----------------------
+
+
+class _Record:
+    """
+    Base for the slotted row types below.
+
+    Fields are plain attributes (b.guest_name), but records also read like a
+    mapping, so existing r["id"] / dict(r) code keeps working. Records are
+    read-only once built, since cached ones (see InventoryCache) are shared
+    between callers; use _asdict() for an editable copy.
+    """
+
+    __slots__ = ()
+    _parsers: Dict[str, Any] = {}
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self.__slots__[key])
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, k) for k in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def _parse_date(value):
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _parse_datetime(value):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+class Booking(_Record):
+    __slots__ = (
+        "id", "guest_name", "booking_date", "adults", "children", "guest_count",
+        "package", "table_id", "room_id", "table_fee", "room_fee", "entrance_fee",
+        "total_amount", "amount_paid", "status", "checkin_time", "updated_at",
+        "expected_checkout_at",
+    )
+    _parsers = {"booking_date": _parse_date, "expected_checkout_at": _parse_datetime}
+
+
+class Table(_Record):
+    __slots__ = ("id", "name", "capacity", "price", "status")
+
+
+class Room(_Record):
+    __slots__ = ("id", "name", "capacity", "price", "status")
+
+
+def record_factory(cls):
+    """
+    Cursor row_factory that builds cls records. Column names are resolved
+    once per result set, not once per row.
+    """
+    slots = cls.__slots__
+    parsers = cls._parsers
+    cached = [None, None]  # [description, column plan]
+    new = object.__new__
+    set_field = object.__setattr__  # records are read-only to everyone else
+
+    def factory(cursor, row):
+        desc = cursor.description
+        if desc is not cached[0]:
+            names = [d[0] for d in desc]
+            cached[0] = desc
+            cached[1] = (
+                [(i, n, parsers.get(n)) for i, n in enumerate(names) if n in slots],
+                [n for n in slots if n not in names],
+            )
+        present, missing = cached[1]
+        rec = new(cls)
+        for i, name, parse in present:
+            value = row[i]
+            set_field(rec, name, parse(value) if parse else value)
+        for name in missing:
+            set_field(rec, name, None)
+        return rec
+
+    return factory
+
 
 @contextmanager
 def get_conn():
-    """c"""
-    conn = sqlite3.connect(
-        DB_PATH,
-        timeout=5,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-    )
-    conn.row_factory = sqlite3.Row
+    """Borrow a pooled connection to DB_PATH for the duration of the block."""
+    path = str(DB_PATH)
+    conn = _pool.acquire(path)
     try:
         yield conn
     finally:
-        conn.close()
+        _pool.release(path, conn)
+
+
+def pool_stats() -> Dict[str, int]:
+    """Connections opened vs. reused since start-up."""
+    return _pool.stats()
+
+
+def close_pool() -> None:
+    _pool.close_all()
 
 
 def init_db() -> None:
@@ -36,7 +412,8 @@ def init_db() -> None:
             username TEXT UNIQUE,
             salt TEXT,
             password_hash TEXT,
-            is_admin INTEGER DEFAULT 0
+            is_admin INTEGER DEFAULT 0,
+            hash_params TEXT
         );
         """
         )
@@ -61,7 +438,8 @@ def init_db() -> None:
             amount_paid REAL NOT NULL DEFAULT 0,
             status TEXT NOT NULL DEFAULT 'checked-in',
             checkin_time TEXT,
-            updated_at TEXT
+            updated_at TEXT,
+            expected_checkout_at TEXT
         );
         """
         )
@@ -92,17 +470,46 @@ def init_db() -> None:
         """
         )
 
+        # facilities attached to a booking (one row per table / room)
+        c.execute(
+            """
+        CREATE TABLE IF NOT EXISTS booking_tables (
+            booking_id INTEGER NOT NULL REFERENCES bookings(id),
+            table_id INTEGER NOT NULL,
+            booking_date TEXT NOT NULL,
+            PRIMARY KEY (booking_id, table_id)
+        );
+        """
+        )
+
+        c.execute(
+            """
+        CREATE TABLE IF NOT EXISTS booking_rooms (
+            booking_id INTEGER NOT NULL REFERENCES bookings(id),
+            room_id INTEGER NOT NULL,
+            booking_date TEXT NOT NULL,
+            PRIMARY KEY (booking_id, room_id)
+        );
+        """
+        )
+
         conn.commit()
 
+        _migrate(conn)
+        ensure_indexes(conn)
+        ensure_search_index(conn)
+        ensure_rollups(conn)
+
         # seed admin if none
         c.execute("SELECT COUNT(*) FROM users")
         if c.fetchone()[0] == 0:
             import utils
 
-            salt, ph = utils.hash_password("Lresort123")
+            params = utils.HASH_PARAMS
+            salt, ph = utils.hash_password("Lresort123", params=params)
             c.execute(
-                "INSERT INTO users (username, salt, password_hash, is_admin) VALUES (?, ?, ?, ?)",
-                ("admin", salt, ph, 1),
+                "INSERT INTO users (username, salt, password_hash, is_admin, hash_params) VALUES (?, ?, ?, ?, ?)",
+                ("admin", salt, ph, 1, params),
             )
             conn.commit()
 
@@ -130,82 +537,496 @@ def init_db() -> None:
             ]
             c.executemany("INSERT INTO rooms (name, capacity, price) VALUES (?, ?, ?)", rooms)
             conn.commit()
+    _inventory.invalidate()
+    _touch_bookings()
 
 
 # ----------------------
-# Availability helpers
+# Schema migrations
 # ----------------------
 
+# Bumped whenever _migrate() learns a new step; stored in PRAGMA user_version.
+SCHEMA_VERSION = 3
 
-def _row_has_id_in_col(row_value: Optional[str], check_id: int) -> bool:
-    """Check whether a comma-separated string column contains a particular id."""
-    if not row_value:
-        return False
-    parts = [p for p in row_value.split(",") if p.strip()]
-    return str(check_id) in parts
+# Overnight and Complete Stay guests are due out at 8:00 AM the next day.
+STAY_PACKAGES = ("overnight", "complete stay")
+CHECKOUT_TIME = "08:00:00"
+_EXPECTED_CHECKOUT_SQL = (
+    "CASE WHEN lower(package) IN (" + ", ".join("'" + p.replace("'", "''") + "'" for p in STAY_PACKAGES) + ") "
+    f"THEN date(booking_date, '+1 day') || ' {CHECKOUT_TIME}' END"
+)
 
 
-def is_table_booked(table_id: Any, date: str) -> bool:
+def _expected_checkout(package: str, booking_date: str) -> Optional[str]:
+    """'YYYY-MM-DD HH:MM:SS' a stay booking is due out, None for day tours."""
+    if not package or package.lower() not in STAY_PACKAGES:
+        return None
+    try:
+        d = date.fromisoformat(booking_date)
+    except (TypeError, ValueError):
+        return None
+    return f"{date.fromordinal(d.toordinal() + 1).isoformat()} {CHECKOUT_TIME}"
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Run one-shot data migrations the database has not seen yet."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    c = conn.cursor()
+    if version < 1:
+        # copy the comma-separated bookings.table_id / room_id into the junction tables
+        c.execute("SELECT id, booking_date, table_id, room_id FROM bookings")
+        for b in c.fetchall():
+            try:
+                tables, rooms = _to_list(b["table_id"]), _to_list(b["room_id"])
+            except ValueError:
+                continue
+            _write_resources(c, b["id"], b["booking_date"], tables, rooms)
+    if version < 2:
+        cols = {r["name"] for r in c.execute("PRAGMA table_info(bookings)")}
+        if "expected_checkout_at" not in cols:
+            c.execute("ALTER TABLE bookings ADD COLUMN expected_checkout_at TEXT")
+        c.execute(f"UPDATE bookings SET expected_checkout_at = {_EXPECTED_CHECKOUT_SQL}")
+    if version < 3:
+        # existing hashes were all made with the old fixed pbkdf2 settings
+        import utils
+
+        cols = {r["name"] for r in c.execute("PRAGMA table_info(users)")}
+        if "hash_params" not in cols:
+            c.execute("ALTER TABLE users ADD COLUMN hash_params TEXT")
+        c.execute("UPDATE users SET hash_params=? WHERE hash_params IS NULL", (utils.LEGACY_HASH_PARAMS,))
+    c.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    conn.commit()
+
+
+# ----------------------
+# Indexes
+# ----------------------
+
+# Secondary indexes on bookings and its junction tables, by name. Add new
+# ones here; ensure_indexes() creates whatever is missing at startup.
+BOOKING_INDEXES: Dict[str, str] = {
+    "idx_booking_tables_date": "booking_tables (booking_date, table_id)",
+    "idx_booking_rooms_date": "booking_rooms (booking_date, room_id)",
+    "idx_bookings_date": "bookings (booking_date)",
+    "idx_bookings_status_date": "bookings (status, booking_date)",
+    "idx_bookings_package_status": "bookings (package, status)",
+    "idx_bookings_guest_name": "bookings (lower(guest_name))",
+    "idx_bookings_status_checkout": "bookings (status, expected_checkout_at)",
+}
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> None:
+    """Create any missing index from BOOKING_INDEXES (safe to call repeatedly)."""
+    c = conn.cursor()
+    for name, target in BOOKING_INDEXES.items():
+        c.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    conn.commit()
+
+
+# ----------------------
+# Guest search (FTS5)
+# ----------------------
+
+# bookings columns mirrored into the full-text index. Adding one here is all
+# a new searchable field needs: ensure_search_index() (run by init_db() and
+# rebuild_search_index()) rebuilds an index whose columns differ.
+FTS_COLUMNS = ("guest_name",)
+FTS_TRIGGERS = ("bookings_fts_ai", "bookings_fts_ad", "bookings_fts_au")
+
+
+def _fts_triggers() -> List[str]:
+    cols = ", ".join(FTS_COLUMNS)
+    new = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+    delete = f"INSERT INTO bookings_fts (bookings_fts, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO bookings_fts (rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS bookings_fts_ai AFTER INSERT ON bookings BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS bookings_fts_ad AFTER DELETE ON bookings BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS bookings_fts_au AFTER UPDATE OF {cols} ON bookings BEGIN {delete} {insert} END",
+    ]
+
+
+def ensure_search_index(conn: sqlite3.Connection) -> bool:
     """
-    table_id can be int, str with commas, or list/tuple of ints.
-    Returns True if any of the provided table ids has an existing checked-in booking for the date.
+    Create the trigram FTS5 index over FTS_COLUMNS (kept in sync by triggers)
+    and fill it the first time, or again when its columns no longer match
+    FTS_COLUMNS. Returns False when this SQLite build has no
+    FTS5 / trigram tokenizer; search then falls back to plain scans.
     """
-    if not table_id:
+    c = conn.cursor()
+    if has_search_index(conn):
+        cols = tuple(r[1] for r in c.execute("PRAGMA table_info(bookings_fts)"))
+        if cols == tuple(FTS_COLUMNS):
+            return True
+        # FTS_COLUMNS changed: the table and its triggers are rebuilt from bookings
+        for trigger in FTS_TRIGGERS:
+            c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        c.execute("DROP TABLE bookings_fts")
+    try:
+        c.execute(
+            f"CREATE VIRTUAL TABLE bookings_fts USING fts5({', '.join(FTS_COLUMNS)}, "
+            "content='bookings', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError:
+        conn.rollback()
         return False
+    for ddl in _fts_triggers():
+        c.execute(ddl)
+    c.execute("INSERT INTO bookings_fts (bookings_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='bookings_fts'").fetchone()
+    return row is not None
+
+
+def rebuild_search_index() -> None:
+    with get_conn() as conn:
+        if ensure_search_index(conn):
+            conn.execute("INSERT INTO bookings_fts (bookings_fts) VALUES ('rebuild')")
+            conn.commit()
+
+
+def _search_index_ready() -> bool:
+    with get_conn() as conn:
+        return has_search_index(conn)
+
+
+def _fts_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
 
-    def ids_from(x):
-        if isinstance(x, (list, tuple)):
-            return [int(i) for i in x]
-        if isinstance(x, int):
-            return [x]
-        if isinstance(x, str):
-            return [int(p) for p in x.split(",") if p.strip()]
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _name_similarity(text: str, name: str) -> float:
+    """Best SequenceMatcher ratio between text and any run of as many words of name."""
+    words = (name or "").lower().split()
+    n = max(1, len(text.split()))
+    windows = [" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))]
+    return max(SequenceMatcher(None, text, w).ratio() for w in windows)
+
+
+def search_guests(prefix: str, limit: int = 20, fuzzy: bool = True) -> List[Booking]:
+    """
+    Bookings whose guest name contains prefix (case-insensitive), best matches first.
+
+    Matches come from the trigram index. When fewer than limit rows contain the
+    text exactly and fuzzy is on, names that share a trigram with it and are
+    at least 75% similar are added too, so "Jonne" still finds "Joanne".
+    Text shorter than 3 characters is matched as a name prefix via the
+    lower(guest_name) index.
+    """
+    text = (prefix or "").strip().lower()
+    if not text:
         return []
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.row_factory = record_factory(Booking)
+        if len(text) < 3 or not has_search_index(conn):
+            c.execute(
+                "SELECT * FROM bookings WHERE lower(guest_name) >= ? AND lower(guest_name) < ? "
+                "ORDER BY booking_date DESC, id DESC LIMIT ?",
+                (text, text + "\uffff", limit),
+            )
+            return c.fetchall()
+
+        c.execute(
+            "SELECT b.* FROM bookings_fts f JOIN bookings b ON b.id = f.rowid "
+            "WHERE bookings_fts MATCH ? ORDER BY f.rank, b.booking_date DESC LIMIT ?",
+            (_fts_phrase(text), limit),
+        )
+        found = c.fetchall()
+        if not fuzzy or len(found) >= limit:
+            return found
+
+        grams = _trigrams(re.sub(r"\s+", " ", text))
+        query = " OR ".join(_fts_phrase(g) for g in sorted(grams))
+        seen = {b.id for b in found}
+        c.execute(
+            "SELECT b.* FROM bookings_fts f JOIN bookings b ON b.id = f.rowid "
+            "WHERE bookings_fts MATCH ? ORDER BY f.rank LIMIT ?",
+            (query, limit * 10),
+        )
+        scored = []
+        for b in c.fetchall():
+            if b.id in seen:
+                continue
+            score = _name_similarity(text, b.guest_name)
+            if score >= 0.75:
+                scored.append((-score, b.id, b))
+        scored.sort(key=lambda t: t[:2])
+        return found + [b for _, _, b in scored[: limit - len(found)]]
 
-    ids = ids_from(table_id)
-    if not ids:
-        return False
 
+# ----------------------
+# Reporting rollups
+# ----------------------
+
+# Per-day and per-month totals by package, kept current by triggers on
+# bookings so every write path (create, update, cancel, payment, import)
+# updates them. Cancelled bookings are not counted.
+ROLLUP_MEASURES = {
+    "bookings": "1",
+    "guests": "{row}.guest_count",
+    "adults": "{row}.adults",
+    "children": "{row}.children",
+    "revenue": "{row}.total_amount",
+    "amount_paid": "{row}.amount_paid",
+}
+ROLLUP_TABLES = {
+    "daily_stats": ("day", "{row}.booking_date"),
+    "monthly_stats": ("month", "substr({row}.booking_date, 1, 7)"),
+}
+
+
+def _rollup_upsert(table: str, row: str, sign: str) -> str:
+    key, key_expr = ROLLUP_TABLES[table]
+    cols = ", ".join(ROLLUP_MEASURES)
+    vals = ", ".join(f"{sign}({expr.format(row=row)})" for expr in ROLLUP_MEASURES.values())
+    sets = ", ".join(f"{m} = {m} + excluded.{m}" for m in ROLLUP_MEASURES)
+    sql = (
+        f"INSERT INTO {table} ({key}, package, {cols}) VALUES ({key_expr.format(row=row)}, {row}.package, {vals}) "
+        f"ON CONFLICT ({key}, package) DO UPDATE SET {sets};"
+    )
+    if sign == "-":
+        # drop buckets whose last booking moved away or was cancelled
+        sql += f" DELETE FROM {table} WHERE {key} = {key_expr.format(row=row)} AND package = {row}.package AND bookings = 0;"
+    return sql
+
+
+def _rollup_triggers() -> List[str]:
+    add = " ".join(_rollup_upsert(t, "new", "+") for t in ROLLUP_TABLES)
+    sub = " ".join(_rollup_upsert(t, "old", "-") for t in ROLLUP_TABLES)
+    watched = "booking_date, package, adults, children, guest_count, total_amount, amount_paid, status"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS rollup_ai AFTER INSERT ON bookings "
+        f"WHEN new.status != 'cancelled' BEGIN {add} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollup_ad AFTER DELETE ON bookings "
+        f"WHEN old.status != 'cancelled' BEGIN {sub} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollup_au_old AFTER UPDATE OF {watched} ON bookings "
+        f"WHEN old.status != 'cancelled' BEGIN {sub} END",
+        f"CREATE TRIGGER IF NOT EXISTS rollup_au_new AFTER UPDATE OF {watched} ON bookings "
+        f"WHEN new.status != 'cancelled' BEGIN {add} END",
+    ]
+
+
+def ensure_rollups(conn: sqlite3.Connection) -> None:
+    """Create the rollup tables and triggers; fill them if they are new."""
+    c = conn.cursor()
+    existed = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_stats'").fetchone()
+    measures = ", ".join(f"{m} {'INTEGER' if m in ('bookings', 'guests', 'adults', 'children') else 'REAL'} NOT NULL DEFAULT 0"
+                         for m in ROLLUP_MEASURES)
+    for table, (key, _) in ROLLUP_TABLES.items():
+        c.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ({key} TEXT NOT NULL, package TEXT NOT NULL, {measures}, "
+            f"PRIMARY KEY ({key}, package))"
+        )
+    for ddl in _rollup_triggers():
+        c.execute(ddl)
+    conn.commit()
+    if not existed:
+        _rebuild_rollups(conn)
+
+
+def _rebuild_rollups(conn: sqlite3.Connection) -> None:
+    c = conn.cursor()
+    sums = ", ".join(f"SUM({expr.format(row='bookings')})" for expr in ROLLUP_MEASURES.values())
+    cols = ", ".join(ROLLUP_MEASURES)
+    for table, (key, key_expr) in ROLLUP_TABLES.items():
+        c.execute(f"DELETE FROM {table}")
+        c.execute(
+            f"INSERT INTO {table} ({key}, package, {cols}) "
+            f"SELECT {key_expr.format(row='bookings')}, package, {sums} FROM bookings "
+            f"WHERE status != 'cancelled' GROUP BY 1, 2"
+        )
+    conn.commit()
+    _touch_bookings()  # caches keyed on the version (guest summaries) must not keep old totals
+
+
+def _add_rollups(c: sqlite3.Cursor, first_id: int, last_id: int) -> None:
+    """Add bookings first_id..last_id to the rollups in one statement per table (bulk inserts)."""
+    sums = ", ".join(f"SUM({expr.format(row='bookings')})" for expr in ROLLUP_MEASURES.values())
+    cols = ", ".join(ROLLUP_MEASURES)
+    sets = ", ".join(f"{m} = {m} + excluded.{m}" for m in ROLLUP_MEASURES)
+    for table, (key, key_expr) in ROLLUP_TABLES.items():
+        c.execute(
+            f"INSERT INTO {table} ({key}, package, {cols}) "
+            f"SELECT {key_expr.format(row='bookings')}, package, {sums} FROM bookings "
+            f"WHERE id BETWEEN ? AND ? AND status != 'cancelled' GROUP BY 1, 2 "
+            f"ON CONFLICT ({key}, package) DO UPDATE SET {sets}",
+            (first_id, last_id),
+        )
+
+
+def rebuild_rollups() -> None:
+    """Recompute daily_stats / monthly_stats from scratch."""
+    with get_conn() as conn:
+        ensure_rollups(conn)
+        _rebuild_rollups(conn)
+
+
+def reconcile_rollups() -> int:
+    """
+    Compare daily_stats / monthly_stats with totals recomputed from bookings
+    and rebuild them if any bucket has drifted (e.g. rows written with the
+    triggers suspended by an interrupted import). Returns the number of
+    drifted buckets; 0 means nothing was rewritten.
+    """
+    # money is summed incrementally by the triggers, so compare to the cent
+    sums = ", ".join(f"ROUND(SUM({expr.format(row='bookings')}), 2)" for expr in ROLLUP_MEASURES.values())
+    cols = ", ".join(f"ROUND({m}, 2)" for m in ROLLUP_MEASURES)
+    drift = 0
     with get_conn() as conn:
+        ensure_rollups(conn)
         c = conn.cursor()
-        for tid in ids:
+        for table, (key, key_expr) in ROLLUP_TABLES.items():
+            expected = (
+                f"SELECT {key_expr.format(row='bookings')}, package, {sums} FROM bookings "
+                f"WHERE status != 'cancelled' GROUP BY 1, 2"
+            )
+            stored = f"SELECT {key}, package, {cols} FROM {table}"
             c.execute(
-                "SELECT 1 FROM bookings WHERE booking_date=? AND instr(','||IFNULL(table_id,'')||',', ','||?||',')>0 AND status='checked-in' LIMIT 1",
-                (date, str(tid)),
+                f"SELECT COUNT(*) FROM ({expected} EXCEPT {stored}) "
+                f"UNION ALL SELECT COUNT(*) FROM ({stored} EXCEPT {expected})"
             )
-            if c.fetchone():
-                return True
-    return False
+            drift += sum(row[0] for row in c.fetchall())
+        if drift:
+            _rebuild_rollups(conn)
+    return drift
 
 
-def is_room_booked(room_id: Any, date: str) -> bool:
-    """Same semantics as is_table_booked for rooms."""
-    if not room_id:
+def fetch_rollup(period: str = "day", date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[sqlite3.Row]:
+    """
+    Totals per day (period="day") or month (period="month"), all packages
+    combined, oldest first. Bounds use the same format as the period key.
+    """
+    table = {"day": "daily_stats", "month": "monthly_stats"}.get(period)
+    if table is None:
+        raise ValueError(f"period must be 'day' or 'month', got {period!r}")
+    key = ROLLUP_TABLES[table][0]
+    where, params = [], []
+    if date_from:
+        where.append(f"{key} >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append(f"{key} <= ?")
+        params.append(date_to)
+    sums = ", ".join(f"SUM({m}) AS {m}" for m in ROLLUP_MEASURES)
+    sql = f"SELECT {key} AS period, {sums} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" GROUP BY {key} ORDER BY {key}"
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        return c.fetchall()
+
+
+def optimize() -> None:
+    """Periodic index upkeep: recreate anything missing and refresh planner stats."""
+    with get_conn() as conn:
+        ensure_indexes(conn)
+        conn.execute("PRAGMA optimize")
+
+
+# ----------------------
+# Availability helpers
+# ----------------------
+
+
+_RESOURCE_KINDS = ("table", "room")
+
+
+def _resource_booked(kind: str, ids: List[int], date: str) -> bool:
+    marks = ",".join("?" * len(ids))
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            f"""
+            SELECT 1 FROM booking_{kind}s j JOIN bookings b ON b.id = j.booking_id
+            WHERE j.booking_date=? AND j.{kind}_id IN ({marks}) AND b.status='checked-in' LIMIT 1
+            """,
+            (date, *ids),
+        )
+        return c.fetchone() is not None
+
+
+def booked_resource_ids(kind: str, date: str) -> Set[int]:
+    """Ids of every table (kind="table") or room (kind="room") with a checked-in booking on date."""
+    if kind not in _RESOURCE_KINDS:
+        raise ValueError(f"kind must be one of {_RESOURCE_KINDS}, got {kind!r}")
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            f"""
+            SELECT DISTINCT j.{kind}_id FROM booking_{kind}s j JOIN bookings b ON b.id = j.booking_id
+            WHERE j.booking_date=? AND b.status='checked-in'
+            """,
+            (date,),
+        )
+        return {r[0] for r in c.fetchall()}
+
+
+def availability_map(date: str) -> Dict[str, Set[int]]:
+    """Booked table and room ids for a date, fetched in a single query."""
+    booked: Dict[str, Set[int]] = {"tables": set(), "rooms": set()}
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT 'tables', j.table_id FROM booking_tables j JOIN bookings b ON b.id = j.booking_id
+            WHERE j.booking_date=? AND b.status='checked-in'
+            UNION
+            SELECT 'rooms', j.room_id FROM booking_rooms j JOIN bookings b ON b.id = j.booking_id
+            WHERE j.booking_date=? AND b.status='checked-in'
+            """,
+            (date, date),
+        )
+        for kind, rid in c.fetchall():
+            booked[kind].add(rid)
+    return booked
+
+
+def is_table_booked(table_id: Any, date: str) -> bool:
+    """
+    table_id can be int, str with commas, or list/tuple of ints.
+    Returns True if any of the provided table ids has an existing checked-in booking for the date.
+    """
+    ids = _to_list(table_id)
+    if not ids:
         return False
+    return _resource_booked("table", ids, date)
 
-    def ids_from(x):
-        if isinstance(x, (list, tuple)):
-            return [int(i) for i in x]
-        if isinstance(x, int):
-            return [x]
-        if isinstance(x, str):
-            return [int(p) for p in x.split(",") if p.strip()]
-        return []
 
-    ids = ids_from(room_id)
+def is_room_booked(room_id: Any, date: str) -> bool:
+    """Same semantics as is_table_booked for rooms."""
+    ids = _to_list(room_id)
     if not ids:
         return False
+    return _resource_booked("room", ids, date)
+
 
+def fetch_resource_bookings_range(kind: str, dfrom: str, dto: str) -> List[tuple]:
+    """(resource_id, booking_date) for every checked-in table/room booking in [dfrom, dto]."""
+    if kind not in _RESOURCE_KINDS:
+        raise ValueError(f"kind must be one of {_RESOURCE_KINDS}, got {kind!r}")
     with get_conn() as conn:
         c = conn.cursor()
-        for rid in ids:
-            c.execute(
-                "SELECT 1 FROM bookings WHERE booking_date=? AND instr(','||IFNULL(room_id,'')||',', ','||?||',')>0 AND status='checked-in' LIMIT 1",
-                (date, str(rid)),
-            )
-            if c.fetchone():
-                return True
-    return False
+        c.execute(
+            f"""
+            SELECT j.{kind}_id, j.booking_date FROM booking_{kind}s j JOIN bookings b ON b.id = j.booking_id
+            WHERE j.booking_date BETWEEN ? AND ? AND b.status='checked-in'
+            """,
+            (dfrom, dto),
+        )
+        return [tuple(r) for r in c.fetchall()]
 
 
 # ----------------------
@@ -220,31 +1041,114 @@ def find_user(username: str) -> Optional[sqlite3.Row]:
         return c.fetchone()
 
 
-def create_user(username: str, salt: str, password_hash: str, is_admin: int = 0) -> None:
+def create_user(username: str, salt: str, password_hash: str, is_admin: int = 0,
+                hash_params: Optional[str] = None) -> None:
     with get_conn() as conn:
         c = conn.cursor()
         c.execute(
-            "INSERT INTO users (username, salt, password_hash, is_admin) VALUES (?, ?, ?, ?)",
-            (username, salt, password_hash, is_admin),
+            "INSERT INTO users (username, salt, password_hash, is_admin, hash_params) VALUES (?, ?, ?, ?, ?)",
+            (username, salt, password_hash, is_admin, hash_params),
+        )
+        conn.commit()
+
+
+def update_password_hash(user_id: int, salt: str, password_hash: str, hash_params: str) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE users SET salt=?, password_hash=?, hash_params=? WHERE id=?",
+            (salt, password_hash, hash_params, user_id),
         )
         conn.commit()
 
 
 # Table / Room helpers
 
-def _list_table_rows(table: str) -> List[sqlite3.Row]:
-    with get_conn() as conn:
-        c = conn.cursor()
-        c.execute(f"SELECT * FROM {table} ORDER BY capacity, id")
-        return c.fetchall()
+class InventoryCache:
+    """
+    Process-wide snapshots of the tables / rooms inventory.
+
+    Snapshots are tuples of read-only records, so callers cannot mutate a
+    shared copy. Every write
+    to the inventory calls invalidate(), which bumps the version; a snapshot
+    loaded under an older version is never served.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: Dict[tuple, tuple] = {}
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, loader) -> tuple:
+        with self._lock:
+            version = self.version
+            snap = self._snapshots.get(key)
+            if snap is not None and snap[0] == version:
+                self.hits += 1
+                return snap[1]
+            self.misses += 1
+        rows = tuple(loader())
+        with self._lock:
+            if self.version == version:
+                self._snapshots[key] = (version, rows)
+        return rows
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._snapshots.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"version": self.version, "hits": self.hits, "misses": self.misses, "entries": len(self._snapshots)}
+
+
+_inventory = InventoryCache()
+
+
+# Bumped on every booking write made through this module; caches of derived
+# data (e.g. the admin graph) key on it.
+_bookings_version = 0
+_bookings_version_lock = threading.Lock()
+
+
+def _touch_bookings() -> None:
+    global _bookings_version
+    with _bookings_version_lock:
+        _bookings_version += 1
+
+
+def bookings_version() -> int:
+    return _bookings_version
+
+
+def invalidate_inventory() -> None:
+    """Drop cached tables / rooms; call after editing them outside this module."""
+    _inventory.invalidate()
+
+
+def inventory_cache_stats() -> Dict[str, int]:
+    return _inventory.stats()
+
+
+def _list_table_rows(table: str, record) -> tuple:
+    def load():
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.row_factory = record_factory(record)
+            c.execute(f"SELECT * FROM {table} ORDER BY capacity, id")
+            return c.fetchall()
+
+    return _inventory.get((str(DB_PATH), table), load)
 
 
 def list_tables():
-    return _list_table_rows("tables")
+    return _list_table_rows("tables", Table)
 
 
 def list_rooms():
-    return _list_table_rows("rooms")
+    return _list_table_rows("rooms", Room)
 
 
 def _set_status(table: str, id_or_list: Any, status: str) -> None:
@@ -261,6 +1165,7 @@ def _set_status(table: str, id_or_list: Any, status: str) -> None:
         for i in ids:
             c.execute(f"UPDATE {table} SET status=? WHERE id=?", (status, i))
         conn.commit()
+    _inventory.invalidate()
 
 
 def occupy_table(id_or_list: Any):
@@ -281,25 +1186,35 @@ def free_room(id_or_list: Any):
 
 # BOOKINGS (atomic)
 def _norm_ids(x: Any) -> Optional[str]:
-    if not x:
-        return None
-    if isinstance(x, str):
-        return x
-    if isinstance(x, int):
-        return str(x)
-    if isinstance(x, (list, tuple)):
-        return ",".join(str(int(i)) for i in x)
-    return str(x)
+    """Canonical comma-separated form stored in bookings.table_id / room_id."""
+    ids = _to_list(x)
+    return ",".join(str(i) for i in ids) if ids else None
 
 
 def _to_list(x: Any) -> List[int]:
     if not x:
         return []
     if isinstance(x, str):
-        return [int(i) for i in x.split(",") if i.strip()]
-    if isinstance(x, (list, tuple)):
-        return [int(i) for i in x]
-    return [int(x)]
+        ids = [int(i) for i in x.split(",") if i.strip()]
+    elif isinstance(x, (list, tuple, set)):
+        ids = [int(i) for i in x]
+    else:
+        ids = [int(x)]
+    return list(dict.fromkeys(ids))
+
+
+def _write_resources(c: sqlite3.Cursor, bid: int, booking_date: str, table_ids: List[int], room_ids: List[int]) -> None:
+    """(Re)write the booking_tables / booking_rooms rows for one booking."""
+    c.execute("DELETE FROM booking_tables WHERE booking_id=?", (bid,))
+    c.execute("DELETE FROM booking_rooms WHERE booking_id=?", (bid,))
+    c.executemany(
+        "INSERT INTO booking_tables (booking_id, table_id, booking_date) VALUES (?, ?, ?)",
+        [(bid, tid, booking_date) for tid in table_ids],
+    )
+    c.executemany(
+        "INSERT INTO booking_rooms (booking_id, room_id, booking_date) VALUES (?, ?, ?)",
+        [(bid, rid, booking_date) for rid in room_ids],
+    )
 
 
 def create_booking(
@@ -333,8 +1248,8 @@ def create_booking(
             (guest_name, booking_date, adults, children, guest_count,
              package, table_id, room_id, table_fee, room_fee,
              entrance_fee, total_amount, amount_paid,
-             status, checkin_time, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'checked-in', ?, ?)
+             status, checkin_time, updated_at, expected_checkout_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'checked-in', ?, ?, ?)
             """,
             (
                 guest_name,
@@ -351,9 +1266,11 @@ def create_booking(
                 total_amount,
                 amount_paid,
                 checkin_time,   # NEW
-                now             # updated_at
+                now,            # updated_at
+                _expected_checkout(package, booking_date),
             ),
         )
+        _write_resources(c, c.lastrowid, booking_date, _to_list(table_s), _to_list(room_s))
 
         # mark tables occupied
         for tid in _to_list(table_s):
@@ -364,21 +1281,25 @@ def create_booking(
             c.execute("UPDATE rooms SET status='occupied' WHERE id=?", (rid,))
 
         conn.commit()
+    _inventory.invalidate()
+    _touch_bookings()
 
 
 
 
 # Fetch bookings
-def fetch_bookings_by_date(date: str):
+def fetch_bookings_by_date(date: str) -> List[Booking]:
     with get_conn() as conn:
         c = conn.cursor()
+        c.row_factory = record_factory(Booking)
         c.execute("SELECT * FROM bookings WHERE booking_date=? ORDER BY id", (date,))
         return c.fetchall()
 
 
-def fetch_bookings_range(dfrom: str, dto: str):
+def fetch_bookings_range(dfrom: str, dto: str) -> List[Booking]:
     with get_conn() as conn:
         c = conn.cursor()
+        c.row_factory = record_factory(Booking)
         c.execute(
             "SELECT * FROM bookings WHERE booking_date BETWEEN ? AND ? ORDER BY booking_date, id",
             (dfrom, dto),
@@ -387,13 +1308,141 @@ def fetch_bookings_range(dfrom: str, dto: str):
 
 
 
+def fetch_bookings_page(
+    dfrom: str, dto: str, after: Optional[Tuple[Any, int]] = None, limit: int = 500
+) -> List[Booking]:
+    """
+    One page of bookings in [dfrom, dto], ordered by (booking_date, id).
+
+    after is the (booking_date, id) of the last row of the previous page
+    (keyset pagination), so later pages cost the same as the first.
+    """
+    sql = "SELECT * FROM bookings WHERE booking_date BETWEEN ? AND ?"
+    params: List[Any] = [dfrom, dto]
+    if after is not None:
+        after_date, after_id = str(after[0]), int(after[1])
+        # tighten the index range, then skip the rows already seen on that date
+        params[0] = max(dfrom, after_date)
+        sql += " AND (booking_date, id) > (?, ?)"
+        params += [after_date, after_id]
+    sql += " ORDER BY booking_date, id LIMIT ?"
+    params.append(int(limit))
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.row_factory = record_factory(Booking)
+        c.execute(sql, params)
+        return c.fetchall()
+
+
+def iter_bookings(dfrom: str = "0000-01-01", dto: str = "9999-12-31", page_size: int = 500) -> Iterator[Booking]:
+    """Stream bookings page by page; no connection is held between pages."""
+    after = None
+    while True:
+        page = fetch_bookings_page(dfrom, dto, after, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+        after = (last.booking_date, last.id)
+
+
+def query_bookings(
+    search: Optional[str] = None,
+    status: Optional[str] = None,
+    booking_date: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    order_by: Iterable[str] = ("booking_date", "id"),
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> List[Booking]:
+    """
+    Filter bookings in SQL. search is a case-insensitive guest-name substring;
+    order_by columns must be Booking fields.
+    """
+    where, params = [], []
+    if search:
+        text = search.lower()
+        if len(text) >= 3 and _search_index_ready():
+            where.append("id IN (SELECT rowid FROM bookings_fts WHERE bookings_fts MATCH ?)")
+            params.append(_fts_phrase(text))
+        else:
+            where.append("instr(lower(guest_name), ?) > 0")
+            params.append(text)
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if booking_date:
+        where.append("booking_date = ?")
+        params.append(booking_date)
+    if date_from:
+        where.append("booking_date >= ?")
+        params.append(date_from)
+    if date_to:
+        where.append("booking_date <= ?")
+        params.append(date_to)
+
+    order = list(order_by)
+    bad = [col for col in order if col not in Booking.__slots__]
+    if bad or not order:
+        raise ValueError(f"Cannot order bookings by {bad or order!r}")
+    direction = " DESC" if descending else ""
+
+    sql = "SELECT * FROM bookings"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(col + direction for col in order)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.row_factory = record_factory(Booking)
+        c.execute(sql, params)
+        return c.fetchall()
+
+
 # Checkout / Cancel / Update / Payment
 
+def fetch_overdue_ids(now: datetime) -> List[int]:
+    """Checked-in bookings whose expected_checkout_at is at or before now."""
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT id FROM bookings WHERE status='checked-in' AND expected_checkout_at <= ? ORDER BY id",
+            (now.strftime("%Y-%m-%d %H:%M:%S"),),
+        )
+        return [r[0] for r in c.fetchall()]
+
+
+def auto_checkout_overdue(now: datetime) -> List[int]:
+    """Check out every overdue booking in one UPDATE; returns the ids checked out."""
+    cutoff = now.strftime("%Y-%m-%d %H:%M:%S")
+    with get_conn() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT id FROM bookings WHERE status='checked-in' AND expected_checkout_at <= ? ORDER BY id",
+            (cutoff,),
+        )
+        ids = [r[0] for r in c.fetchall()]
+        if ids:
+            c.execute(
+                f"UPDATE bookings SET status='checked-out', updated_at=? "
+                f"WHERE id IN ({','.join('?' * len(ids))}) AND status='checked-in'",
+                (datetime.now().isoformat(), *ids),
+            )
+        conn.commit()
+    if ids:
+        _touch_bookings()
+    return ids
+
+
 def checkout_booking(bid: int):
     with get_conn() as conn:
         c = conn.cursor()
         c.execute("UPDATE bookings SET status='checked-out' WHERE id=?", (bid,))
         conn.commit()
+    _touch_bookings()
 
 
 def cancel_booking(bid: int):
@@ -401,18 +1450,30 @@ def cancel_booking(bid: int):
         c = conn.cursor()
         c.execute("UPDATE bookings SET status='cancelled' WHERE id=?", (bid,))
         conn.commit()
+    _touch_bookings()
 
 
 def update_booking(bid: int, **kwargs):
     if not kwargs:
         return
+    for k in ("table_id", "room_id"):
+        if k in kwargs:
+            kwargs[k] = _norm_ids(kwargs[k])
     with get_conn() as conn:
         c = conn.cursor()
         fields = ", ".join(f"{k}=?" for k in kwargs)
         values = list(kwargs.values())
         values.append(bid)
         c.execute(f"UPDATE bookings SET {fields} WHERE id=?", values)
+        if {"package", "booking_date"} & kwargs.keys():
+            c.execute(f"UPDATE bookings SET expected_checkout_at = {_EXPECTED_CHECKOUT_SQL} WHERE id=?", (bid,))
+        if {"table_id", "room_id", "booking_date"} & kwargs.keys():
+            c.execute("SELECT booking_date, table_id, room_id FROM bookings WHERE id=?", (bid,))
+            b = c.fetchone()
+            if b:
+                _write_resources(c, bid, b["booking_date"], _to_list(b["table_id"]), _to_list(b["room_id"]))
         conn.commit()
+    _touch_bookings()
 
 
 def set_payment(bid: int, amount: float):
@@ -420,54 +1481,374 @@ def set_payment(bid: int, amount: float):
         c = conn.cursor()
         c.execute("UPDATE bookings SET amount_paid = amount_paid + ? WHERE id=?", (amount, bid))
         conn.commit()
+    _touch_bookings()
 
 
 # Export helpers
+
+# Column order of booking CSV files; import_bookings_csv() reads the same layout.
+BOOKING_CSV_COLUMNS = (
+    "id",
+    "guest_name",
+    "booking_date",
+    "adults",
+    "children",
+    "guest_count",
+    "package",
+    "table_id",
+    "room_id",
+    "total_amount",
+    "amount_paid",
+    "status",
+)
+
+
+EXPORT_CHUNK_SIZE = 5_000
+EXPORT_COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+
 def export_bookings_csv(rows: Iterable[Dict[str, Any]], path: str):
     """
-    rows: iterable of sqlite3.Row or dict-like objects with keys used below.
+    rows: iterable of sqlite3.Row, Booking or dict-like objects with keys used below.
     path: filesystem path to write to.
+
+    For whole date ranges prefer export_bookings(), which streams from the
+    database instead of needing the rows in memory.
     """
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
     with open(p, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow(
-            [
-                "id",
-                "guest_name",
-                "booking_date",
-                "adults",
-                "children",
-                "guest_count",
-                "package",
-                "table_id",
-                "room_id",
-                "total_amount",
-                "amount_paid",
-                "status",
-            ]
+        w.writerow(BOOKING_CSV_COLUMNS)
+        w.writerows([r[k] for k in BOOKING_CSV_COLUMNS] for r in rows)
+
+
+def _open_export(path: Path, compression: Optional[str]):
+    """Text stream for path, compressed on the fly when asked; zstd needs the zstandard package."""
+    if compression == "gzip":
+        import gzip
+
+        return gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+    if compression == "zstd":
+        import io
+        import zstandard
+
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if compression is not None:
+        raise ValueError(f"compression must be 'gzip', 'zstd' or None, got {compression!r}")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def export_bookings(
+    path: str,
+    columns: Optional[Iterable[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    compression: Optional[str] = "auto",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Write bookings in (booking_date, id) order to a CSV, streaming from one
+    cursor chunk_size rows at a time so memory stays flat however many
+    years are exported. The whole export reads one consistent snapshot.
+
+    columns defaults to BOOKING_CSV_COLUMNS (what import_bookings_csv()
+    reads); any bookings column may be chosen. date_from / date_to bound
+    booking_date inclusively. compression is "gzip", "zstd", None, or "auto"
+    to pick from the suffix (.gz / .zst).
+
+    Returns {"rows": n, "seconds": s, "rows_per_sec": r, "path": path}.
+    """
+    started = time.perf_counter()
+    p = Path(path)
+    if compression == "auto":
+        compression = EXPORT_COMPRESSIONS.get(p.suffix.lower())
+    columns = list(columns or BOOKING_CSV_COLUMNS)
+    where, params = [], []
+    if date_from:
+        where.append("booking_date >= ?")
+        params.append(str(date_from))
+    if date_to:
+        where.append("booking_date <= ?")
+        params.append(str(date_to))
+    rows = 0
+    with get_conn() as conn:
+        known = {r["name"] for r in conn.execute("PRAGMA table_info(bookings)")}
+        unknown = [col for col in columns if col not in known]
+        if unknown:
+            raise ValueError(f"unknown bookings column(s): {', '.join(unknown)}")
+        sql = f"SELECT {', '.join(columns)} FROM bookings"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY booking_date, id"
+        c = conn.cursor()
+        c.row_factory = None  # plain tuples go straight to csv.writer
+        c.execute(sql, params)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with _open_export(p, compression) as f:
+            w = csv.writer(f)
+            w.writerow(columns)
+            while True:
+                chunk = c.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                w.writerows(chunk)
+                rows += len(chunk)
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0, "path": str(p)}
+
+
+# Import helpers
+
+IMPORT_CHUNK_SIZE = 50_000
+BOOKING_STATUSES = ("checked-in", "checked-out", "cancelled")
+_IMPORT_REQUIRED = ("guest_name", "booking_date", "adults", "children", "package")
+
+
+def _import_row_parser(header: List[str], table_ids: Set[int], room_ids: Set[int], now: str):
+    """
+    Build parse(row) for csv.reader rows with this header. It returns
+    (values, table ids, room ids), values being the bookings INSERT
+    parameters with a None placeholder for the id, or raises ValueError
+    with the reason. This runs once per imported row, so it is kept lean.
+    """
+    pos = {name: i for i, name in enumerate(header)}
+    missing = [k for k in _IMPORT_REQUIRED if k not in pos]
+    if missing:
+        raise ValueError(f"missing column(s) {', '.join(missing)}")
+    i_name, i_date, i_adults, i_children, i_package = (pos[k] for k in _IMPORT_REQUIRED)
+    # absent optional columns point one past the end, at the "" padding
+    i_tables, i_rooms, i_total, i_paid, i_tfee, i_rfee, i_efee, i_status = (
+        pos.get(k, len(header)) for k in ("table_id", "room_id", "total_amount", "amount_paid",
+                                          "table_fee", "room_fee", "entrance_fee", "status"))
+    width = max(i_name, i_date, i_adults, i_children, i_package,
+                i_tables, i_rooms, i_total, i_paid, i_tfee, i_rfee, i_efee, i_status) + 1
+    pad = [""] * width
+    # (package, booking_date) -> expected_checkout_at; seasons repeat the same few thousand pairs
+    due_by_key: Dict[Tuple[str, str], Optional[str]] = {}
+    # table_id / room_id text -> (canonical text, ids); likewise only a few distinct values
+    tables_by_text: Dict[str, Tuple[Optional[str], List[int]]] = {"": (None, [])}
+    rooms_by_text: Dict[str, Tuple[Optional[str], List[int]]] = {"": (None, [])}
+
+    def resources(text: str, known: Set[int], kind: str, cache: Dict) -> Tuple[Optional[str], List[int]]:
+        try:
+            found = _to_list(text)
+        except ValueError:
+            raise ValueError(f"bad {kind}_id {text!r}") from None
+        for i in found:
+            if i not in known:
+                raise ValueError(f"unknown {kind} {i}")
+        cache[text] = entry = (",".join(map(str, found)) or None, found)
+        return entry
+
+    def booking_date_due(package: str, booking_date: str) -> Optional[str]:
+        # only canonical YYYY-MM-DD: fromisoformat alone also takes 20250101 or 2025-W01-3,
+        # which would never match the date-range queries
+        try:
+            ok = date.fromisoformat(booking_date).isoformat() == booking_date
+        except ValueError:
+            ok = False
+        if not ok:
+            raise ValueError(f"bad booking_date {booking_date!r} (expected YYYY-MM-DD)")
+        due_by_key[(package, booking_date)] = due = _expected_checkout(package, booking_date)
+        return due
+
+    def parse(row: List[str]) -> Tuple[list, List[int], List[int]]:
+        if len(row) < width:
+            row += pad[len(row):]
+        name, booking_date, package = row[i_name].strip(), row[i_date].strip(), row[i_package].strip()
+        if not (name and booking_date and package):
+            raise ValueError("missing guest_name, booking_date or package")
+        due = due_by_key.get((package, booking_date), False)
+        if due is False:
+            due = booking_date_due(package, booking_date)
+        try:
+            # int() / float() ignore surrounding whitespace themselves
+            adults, children = int(row[i_adults]), int(row[i_children])
+            t_fee, r_fee, e_fee = float(row[i_tfee] or 0), float(row[i_rfee] or 0), float(row[i_efee] or 0)
+            total, paid = float(row[i_total] or 0), float(row[i_paid] or 0)
+        except ValueError as e:
+            raise ValueError(f"bad number: {e}") from None
+        if adults < 0 or children < 0:
+            raise ValueError("negative guest count")
+        text = row[i_tables]
+        t_ids, tables = tables_by_text.get(text) or resources(text, table_ids, "table", tables_by_text)
+        text = row[i_rooms]
+        r_ids, rooms = rooms_by_text.get(text) or resources(text, room_ids, "room", rooms_by_text)
+        # history: a row without a status is a finished stay, not a current guest
+        status = row[i_status].strip() or "checked-out"
+        if status not in BOOKING_STATUSES:
+            raise ValueError(f"bad status {status!r}")
+        return (
+            [None, name, booking_date, adults, children, adults + children, package, t_ids, r_ids,
+             t_fee, r_fee, e_fee, total, paid, status, now, due],
+            tables,
+            rooms,
         )
-        for r in rows:
-            # support sqlite Row or dict
-            try:
-                get = lambda k: r[k]
-            except Exception:
-                get = lambda k: r.get(k)
-            w.writerow(
-                [
-                    get("id"),
-                    get("guest_name"),
-                    get("booking_date"),
-                    get("adults"),
-                    get("children"),
-                    get("guest_count"),
-                    get("package"),
-                    get("table_id"),
-                    get("room_id"),
-                    get("total_amount"),
-                    get("amount_paid"),
-                    get("status"),
-                ]
+
+    return parse
+
+
+def _insert_import_chunk(conn: sqlite3.Connection, parsed: List[tuple]) -> None:
+    """
+    Insert one chunk in its own transaction, with ids allocated after both
+    max(id) and the AUTOINCREMENT high-water mark, so ids of deleted rows
+    (and any junction rows left pointing at them) are never reused. The per-row search / rollup insert triggers are dropped
+    for the chunk and their work done once in SQL over the new id range; the
+    DDL is part of the transaction, so other connections never see the
+    triggers missing.
+    """
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        first = c.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(id) FROM bookings), 0), "
+            "COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'bookings'), 0)) + 1"
+        ).fetchone()[0]
+        last = first + len(parsed) - 1
+        bookings, tables, rooms = [], [], []
+        for bid, (values, table_list, room_list) in enumerate(parsed, first):
+            values[0] = bid
+            bookings.append(values)
+            if table_list:
+                tables.extend((bid, tid, values[2]) for tid in table_list)
+            if room_list:
+                rooms.extend((bid, rid, values[2]) for rid in room_list)
+        fts = has_search_index(conn)
+        c.execute("DROP TRIGGER IF EXISTS rollup_ai")
+        c.execute("DROP TRIGGER IF EXISTS bookings_fts_ai")
+        c.executemany(
+            """
+            INSERT INTO bookings
+            (id, guest_name, booking_date, adults, children, guest_count,
+             package, table_id, room_id, table_fee, room_fee,
+             entrance_fee, total_amount, amount_paid,
+             status, updated_at, expected_checkout_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            bookings,
+        )
+        c.executemany("INSERT INTO booking_tables (booking_id, table_id, booking_date) VALUES (?, ?, ?)", tables)
+        c.executemany("INSERT INTO booking_rooms (booking_id, room_id, booking_date) VALUES (?, ?, ?)", rooms)
+        _add_rollups(c, first, last)
+        for ddl in _rollup_triggers():
+            c.execute(ddl)
+        if fts:
+            cols = ", ".join(FTS_COLUMNS)
+            c.execute(
+                f"INSERT INTO bookings_fts (rowid, {cols}) SELECT id, {cols} FROM bookings WHERE id BETWEEN ? AND ?",
+                (first, last),
             )
+            for ddl in _fts_triggers():
+                c.execute(ddl)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
 
+def import_bookings_csv(path: str, chunk_size: int = IMPORT_CHUNK_SIZE, defer_indexes: bool = False) -> Dict[str, Any]:
+    """
+    Stream bookings from a CSV in export_bookings_csv()'s layout (optional
+    table_fee / room_fee / entrance_fee columns are read too) into the
+    database, chunk_size rows per transaction.
+
+    The file's id column is ignored: each chunk gets fresh ids after the
+    current max(id). Junction rows, expected_checkout_at, the rollups and the
+    search index are filled as for create_booking; the tables / rooms status
+    flags are left alone since imports are history.
+
+    defer_indexes drops BOOKING_INDEXES (bookings and junction tables) for
+    the import and rebuilds them at the end, which is much faster for large
+    migrations but leaves queries unindexed meanwhile; init_db() recreates
+    them if the import dies.
+
+    Invalid rows are skipped and reported. Chunks already committed stay if
+    a later one fails. Returns {"imported": n, "errors": [(line, message),
+    ...], "seconds": s, "rows_per_sec": r}.
+    """
+    started = time.perf_counter()
+    now = datetime.now().isoformat()
+    with get_conn() as conn:
+        table_ids = {r[0] for r in conn.execute("SELECT id FROM tables")}
+        room_ids = {r[0] for r in conn.execute("SELECT id FROM rooms")}
+    imported, errors, parsed = 0, [], []
+    with open(path, newline="", encoding="utf-8") as f, get_conn() as conn:
+        reader = csv.reader(f)
+        try:
+            parse = _import_row_parser([h.strip() for h in next(reader, [])], table_ids, room_ids, now)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+        if defer_indexes:
+            for name in BOOKING_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        try:
+            for row in reader:
+                if not row:
+                    continue
+                try:
+                    parsed.append(parse(row))
+                except ValueError as e:
+                    errors.append((reader.line_num, str(e)))
+                    continue
+                if len(parsed) >= chunk_size:
+                    _insert_import_chunk(conn, parsed)
+                    imported += len(parsed)
+                    parsed = []
+            if parsed:
+                _insert_import_chunk(conn, parsed)
+                imported += len(parsed)
+        finally:
+            if defer_indexes:
+                ensure_indexes(conn)
+            if imported:
+                _touch_bookings()
+    seconds = time.perf_counter() - started
+    return {"imported": imported, "errors": errors, "seconds": seconds,
+            "rows_per_sec": imported / seconds if seconds else 0.0}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resort database maintenance")
+    parser.add_argument("--db", help="database file (default: resort.db next to this module)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild-rollups", help="recompute daily_stats / monthly_stats from bookings")
+    sub.add_parser("rebuild-search", help="rebuild the guest full-text index")
+    exp = sub.add_parser("export-csv", help="export bookings to a CSV (.gz / .zst are compressed)")
+    exp.add_argument("csv", help="file to write")
+    exp.add_argument("--from", dest="date_from", help="first booking_date (YYYY-MM-DD)")
+    exp.add_argument("--to", dest="date_to", help="last booking_date (YYYY-MM-DD)")
+    exp.add_argument("--columns", help="comma-separated bookings columns (default: the import layout)")
+    imp = sub.add_parser("import-csv", help="import bookings from a CSV in the export layout")
+    imp.add_argument("csv", help="file to import")
+    imp.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="rows per transaction")
+    imp.add_argument("--defer-indexes", action="store_true", help="rebuild secondary indexes after the import")
+    args = parser.parse_args(argv)
+
+    global DB_PATH
+    if args.db:
+        DB_PATH = Path(args.db)
+    init_db()
+    if args.command == "rebuild-rollups":
+        rebuild_rollups()
+    elif args.command == "rebuild-search":
+        rebuild_search_index()
+    elif args.command == "export-csv":
+        columns = [col.strip() for col in args.columns.split(",")] if args.columns else None
+        report = export_bookings(args.csv, columns, args.date_from, args.date_to)
+        print(f"exported {report['rows']} bookings in {report['seconds']:.1f}s ({report['rows_per_sec']:,.0f} rows/s)")
+    elif args.command == "import-csv":
+        report = import_bookings_csv(args.csv, args.chunk_size, args.defer_indexes)
+        for line, message in report["errors"]:
+            print(f"line {line}: {message}")
+        print(f"imported {report['imported']} bookings in {report['seconds']:.1f}s "
+              f"({report['rows_per_sec']:,.0f} rows/s), {len(report['errors'])} rejected")
+    close_pool()
+
+
+if __name__ == "__main__":
+    main()
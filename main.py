@@ -5,7 +5,10 @@ import sys
 def main():
     database.init_db()
     app = LoginWindow()
-    app.mainloop()
+    try:
+        app.mainloop()
+    finally:
+        database.close_pool()
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 import database as db
-from itertools import combinations
-from typing import List, Optional
+from allocator import cheapest_cover
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
 
 
 # user model
@@ -8,8 +9,76 @@ def find_user(username):
     return db.find_user(username)
 
 
-def create_user(username, salt, pw_hash, is_admin=0):
-    return db.create_user(username, salt, pw_hash, is_admin)
+def create_user(username, salt, pw_hash, is_admin=0, hash_params=None):
+    return db.create_user(username, salt, pw_hash, is_admin, hash_params)
+
+
+def update_password_hash(user_id, salt, pw_hash, hash_params):
+    return db.update_password_hash(user_id, salt, pw_hash, hash_params)
+
+
+class OccupancyCalendar:
+    """
+    Resource x date occupancy for a date range.
+
+    Each resource is stored as one int bitmask where bit i is set when the
+    resource is booked on dates[i], so a quarter for every table and room is
+    a few dozen small ints.
+    """
+
+    __slots__ = ("resource_ids", "dates", "_bits", "_col")
+
+    def __init__(self, resource_ids: Iterable[int], date_from: str, date_to: str, bookings: Iterable[tuple]):
+        start = datetime.strptime(date_from, "%Y-%m-%d").date()
+        end = datetime.strptime(date_to, "%Y-%m-%d").date()
+        days = (end - start).days + 1
+        self.resource_ids = list(resource_ids)
+        self.dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(max(days, 0))]
+        self._col = {d: i for i, d in enumerate(self.dates)}
+        self._bits = dict.fromkeys(self.resource_ids, 0)
+        for rid, day in bookings:
+            i = self._col.get(day)
+            if i is not None and rid in self._bits:
+                self._bits[rid] |= 1 << i
+
+    def is_booked(self, resource_id: int, day: str) -> bool:
+        i = self._col.get(day)
+        if i is None:
+            raise KeyError(f"{day} is outside the calendar range")
+        return bool(self._bits.get(resource_id, 0) >> i & 1)
+
+    def booked_dates(self, resource_id: int) -> List[str]:
+        bits = self._bits.get(resource_id, 0)
+        return [d for i, d in enumerate(self.dates) if bits >> i & 1]
+
+    def free_ids(self, day: str) -> List[int]:
+        i = self._col[day]
+        return [rid for rid in self.resource_ids if not self._bits[rid] >> i & 1]
+
+    def free_all_range(self) -> List[int]:
+        """Resources with no booking anywhere in the range."""
+        return [rid for rid in self.resource_ids if not self._bits[rid]]
+
+    def booked_count(self, day: str) -> int:
+        return len(self.resource_ids) - len(self.free_ids(day))
+
+    def rows(self) -> List[List[bool]]:
+        """Plain matrix, one row per resource_ids entry, one column per date."""
+        n = len(self.dates)
+        return [[bool(self._bits[rid] >> i & 1) for i in range(n)] for rid in self.resource_ids]
+
+    def as_array(self):
+        """Boolean NumPy array of rows(); needs numpy installed."""
+        import numpy as np
+
+        n = len(self.dates)
+        out = np.zeros((len(self.resource_ids), n), dtype=bool)
+        for r, rid in enumerate(self.resource_ids):
+            bits = self._bits[rid]
+            if bits:
+                packed = np.frombuffer(bits.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+                out[r] = np.unpackbits(packed, bitorder="little")[:n].astype(bool)
+        return out
 
 
 class TableModel:
@@ -32,7 +101,8 @@ class TableModel:
 
         # 2. Filter by date availability
         if date:
-            rows = [r for r in rows if not db.is_table_booked(r["id"], date)]
+            booked = db.booked_resource_ids("table", date)
+            rows = [r for r in rows if r["id"] not in booked]
 
         # 3. Filter: Capacity must be >= guest_count
         candidates = [r for r in rows if r["capacity"] >= guest_count]
@@ -45,36 +115,37 @@ class TableModel:
         return None
 
     @staticmethod
-    def find_tables_for(guest_count, date=None) -> List:
+    def free_for(date=None, booked=None) -> List:
+        """Tables with status 'available' and, when date is given, not booked that day."""
         rows = [r for r in db.list_tables() if r["status"] == "available"]
         if date:
-            rows = [r for r in rows if not db.is_table_booked(r["id"], date)]
+            if booked is None:
+                booked = db.booked_resource_ids("table", date)
+            rows = [r for r in rows if r["id"] not in booked]
+        return rows
+
+    @staticmethod
+    def find_tables_for(guest_count, date=None) -> List:
+        """Cheapest set of free tables that seats guest_count (see allocator.cheapest_cover)."""
+        rows = TableModel.free_for(date)
         if not rows:
             return []
-        # greedy by capacity descending then price
-        rows.sort(key=lambda x: (-x["capacity"], x["price"]))
-        selected = []
-        total = 0
-        for r in rows:
-            if total >= guest_count:
-                break
-            selected.append(r)
-            total += r["capacity"]
-        if total >= guest_count:
-            return selected
-        # combinatorial fallback (small sizes)
-        max_comb = min(5, len(rows))
-        for sz in range(1, max_comb + 1):
-            for comb in combinations(rows, sz):
-                if sum(r["capacity"] for r in comb) >= guest_count:
-                    return list(comb)
-        return []
+        return cheapest_cover(rows, guest_count)
 
     @staticmethod
     def is_table_booked(table_id, date):
         # reuse the low-level database function already implemented
         return db.is_table_booked(table_id, date)
 
+    @staticmethod
+    def booked_ids(date):
+        return db.booked_resource_ids("table", date)
+
+    @staticmethod
+    def calendar(date_from, date_to) -> OccupancyCalendar:
+        ids = [r["id"] for r in db.list_tables()]
+        return OccupancyCalendar(ids, date_from, date_to, db.fetch_resource_bookings_range("table", date_from, date_to))
+
 
 class RoomModel:
     @staticmethod
@@ -93,7 +164,8 @@ class RoomModel:
     def find_suitable(guest_count, date=None):
         rows = db.list_rooms()
         if date:
-            rows = [r for r in rows if not db.is_room_booked(r["id"], date)]
+            booked = db.booked_resource_ids("room", date)
+            rows = [r for r in rows if r["id"] not in booked]
 
         candidates = [r for r in rows if r["capacity"] >= guest_count]
 
@@ -104,34 +176,37 @@ class RoomModel:
         return None
 
     @staticmethod
-    def find_rooms_for(guest_count, date=None):
+    def free_for(date=None, booked=None) -> List:
+        """Rooms with status 'available' and, when date is given, not booked that day."""
         rows = [r for r in db.list_rooms() if r["status"] == "available"]
         if date:
-            rows = [r for r in rows if not db.is_room_booked(r["id"], date)]
+            if booked is None:
+                booked = db.booked_resource_ids("room", date)
+            rows = [r for r in rows if r["id"] not in booked]
+        return rows
+
+    @staticmethod
+    def find_rooms_for(guest_count, date=None):
+        """Cheapest set of free rooms that sleeps guest_count."""
+        rows = RoomModel.free_for(date)
         if not rows:
             return []
-        rows.sort(key=lambda x: (-x["capacity"], x["price"]))
-        selected = []
-        total = 0
-        for r in rows:
-            if total >= guest_count:
-                break
-            selected.append(r)
-            total += r["capacity"]
-        if total >= guest_count:
-            return selected
-        max_comb = min(6, len(rows))
-        for sz in range(1, max_comb + 1):
-            for comb in combinations(rows, sz):
-                if sum(r["capacity"] for r in comb) >= guest_count:
-                    return list(comb)
-        return []
+        return cheapest_cover(rows, guest_count)
 
     @staticmethod
     def is_room_booked(room_id, date):
         # reuse the low-level database function already implemented
         return db.is_room_booked(room_id, date)
 
+    @staticmethod
+    def booked_ids(date):
+        return db.booked_resource_ids("room", date)
+
+    @staticmethod
+    def calendar(date_from, date_to) -> OccupancyCalendar:
+        ids = [r["id"] for r in db.list_rooms()]
+        return OccupancyCalendar(ids, date_from, date_to, db.fetch_resource_bookings_range("room", date_from, date_to))
+
 
 class BookingModel:
     @staticmethod
@@ -146,6 +221,26 @@ class BookingModel:
     def fetch_range(date_from, date_to):
         return db.fetch_bookings_range(date_from, date_to)
 
+    @staticmethod
+    def fetch_page(date_from, date_to, after=None, limit=500):
+        return db.fetch_bookings_page(date_from, date_to, after, limit)
+
+    @staticmethod
+    def iter_range(date_from, date_to, page_size=500):
+        return db.iter_bookings(date_from, date_to, page_size)
+
+    @staticmethod
+    def query(**filters):
+        return db.query_bookings(**filters)
+
+    @staticmethod
+    def search_guests(text, limit=20):
+        return db.search_guests(text, limit)
+
+    @staticmethod
+    def rollup(period, date_from=None, date_to=None):
+        return db.fetch_rollup(period, date_from, date_to)
+
     @staticmethod
     def checkout(bid):
         return db.checkout_booking(bid)
@@ -166,7 +261,16 @@ class BookingModel:
     def export_csv(rows, path):
         return db.export_bookings_csv(rows, path)
 
+    @staticmethod
+    def export(path, columns=None, date_from=None, date_to=None, compression="auto"):
+        return db.export_bookings(path, columns, date_from, date_to, compression)
+
+    @staticmethod
+    def import_csv(path, chunk_size=db.IMPORT_CHUNK_SIZE, defer_indexes=False):
+        return db.import_bookings_csv(path, chunk_size, defer_indexes)
+
 
 # expose availability helpers for controllers
 is_table_booked = db.is_table_booked
 is_room_booked = db.is_room_booked
+availability_map = db.availability_map
@@ -0,0 +1,140 @@
+"""Periodic background jobs, run on a worker thread instead of the Tk main loop."""
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Seconds between runs; RESORT_<JOB>_INTERVAL overrides each one,
+# e.g. RESORT_OVERDUE_CHECKOUTS_INTERVAL=60.
+DEFAULT_INTERVALS: Dict[str, float] = {
+    "overdue_checkouts": 300,
+    "index_maintenance": 6 * 3600,
+    "reporting_rollup": 900,
+}
+
+
+def interval_for(name: str, default: float) -> float:
+    val = os.environ.get(f"RESORT_{name.upper()}_INTERVAL")
+    return float(val) if val else default
+
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Any], interval: float, next_run: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = next_run
+        self.runs = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_duration": self.last_duration,
+            "avg_duration": self.total_duration / self.runs if self.runs else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Runs registered jobs on one daemon thread.
+
+    Every run is posted to `results` as (job name, result, error, seconds);
+    the GUI drains that queue from Tk's after() loop, so no widget is ever
+    touched from the worker thread.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.results: "queue.Queue[tuple]" = queue.Queue()
+        self._clock = clock
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float, run_now: bool = True) -> None:
+        now = self._clock()
+        with self._lock:
+            self._jobs[name] = Job(name, func, interval, now if run_now else now + interval)
+
+    def run_pending(self) -> int:
+        """Run every job that is due; returns how many ran."""
+        now = self._clock()
+        with self._lock:
+            due = [j for j in self._jobs.values() if j.next_run <= now]
+        for job in due:
+            if self._stop.is_set():
+                break
+            self._run(job)
+        return len(due)
+
+    def _run(self, job: Job) -> None:
+        start = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            job.runs += 1
+            job.last_duration = elapsed
+            job.total_duration += elapsed
+            if error:
+                job.errors += 1
+                job.last_error = error
+            job.next_run = self._clock() + job.interval
+        self.results.put((job.name, result, error, elapsed))
+
+    def _seconds_to_next(self) -> float:
+        with self._lock:
+            if not self._jobs:
+                return 1.0
+            return max(0.0, min(j.next_run for j in self._jobs.values()) - self._clock())
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(min(self._seconds_to_next(), 1.0))
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="resort-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: job.stats() for name, job in self._jobs.items()}
+
+
+def build_scheduler(intervals: Optional[Dict[str, float]] = None) -> Scheduler:
+    """Scheduler with the standard housekeeping jobs registered."""
+    import database as db
+    from controllers import AdminController
+
+    intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+    admin = AdminController()
+    sched = Scheduler()
+    sched.add_job("overdue_checkouts", admin.check_auto_checkout,
+                  interval_for("overdue_checkouts", intervals["overdue_checkouts"]))
+    sched.add_job("index_maintenance", db.optimize,
+                  interval_for("index_maintenance", intervals["index_maintenance"]), run_now=False)
+    # the triggers keep the rollups current; this catches drift from writes that bypassed them
+    sched.add_job("reporting_rollup", db.reconcile_rollups,
+                  interval_for("reporting_rollup", intervals["reporting_rollup"]), run_now=False)
+    return sched
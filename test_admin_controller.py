@@ -50,3 +50,149 @@ def test_check_auto_checkout_marks_overdue(tmp_path, monkeypatch):
 
     # The one Overnight booking from yesterday should now be overdue
     assert len(overdue_ids) == 1
+
+
+def test_check_auto_checkout_respects_cutoff_and_package(tmp_path, book, frozen_now):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", "Overnight")
+    book("2025-01-01", "Complete Stay")
+    book("2025-01-01", "Day Tour")
+    book("2025-01-02", "Overnight")
+
+    admin = controllers.AdminController()
+
+    frozen_now(datetime(2025, 1, 2, 7, 59, 0))
+    assert admin.check_auto_checkout() == []
+
+    frozen_now(datetime(2025, 1, 2, 8, 0, 0))
+    assert len(admin.check_auto_checkout()) == 2
+
+
+def test_check_auto_checkout_batch_update(tmp_path, book, frozen_now):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", "Overnight")
+    frozen_now(datetime(2025, 1, 3, 9, 0, 0))
+
+    admin = controllers.AdminController()
+    ids = admin.check_auto_checkout(auto_checkout=True)
+
+    assert len(ids) == 1
+    assert BookingModel.fetch_by_date("2025-01-01")[0]["status"] == "checked-out"
+    assert admin.check_auto_checkout() == []
+
+
+def test_update_booking_recomputes_due_time(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", "Day Tour")
+    b = BookingModel.fetch_by_date("2025-01-01")[0]
+    assert b["expected_checkout_at"] is None
+
+    BookingModel.update(b["id"], package="Overnight")
+    b = BookingModel.fetch_by_date("2025-01-01")[0]
+    assert b["expected_checkout_at"] == datetime(2025, 1, 2, 8, 0, 0)
+
+
+def test_report_pages_cover_all_rows_in_order(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    for day in ("2025-01-03", "2025-01-01", "2025-01-02", "2025-01-01", "2025-01-02"):
+        book(day, "Day Tour")
+
+    admin = controllers.AdminController()
+    expected = [(r["booking_date"], r["id"]) for r in admin.report_range("0000-01-01", "9999-12-31")]
+
+    streamed = [(r["booking_date"], r["id"]) for r in admin.iter_report(page_size=2)]
+    assert streamed == expected
+    assert [(r["booking_date"], r["id"]) for r in admin.report_all()] == expected
+
+    paged, after = [], None
+    while True:
+        rows, after = admin.report_page(after, limit=2)
+        paged += [(r["booking_date"], r["id"]) for r in rows]
+        if after is None:
+            break
+    assert paged == expected
+
+
+def test_search_bookings_filters_in_sql(tmp_path, book, frozen_now):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    for name, day in (("Anna Cruz", "2025-01-01"), ("Joanne Reyes", "2025-01-02"), ("Mark Santos", "2025-01-02")):
+        book(day, name=name, adults=1)
+    BookingModel.checkout(BookingModel.fetch_by_date("2025-01-01")[0]["id"])
+    frozen_now(datetime(2025, 1, 2, 10, 0, 0))
+
+    admin = controllers.AdminController()
+    names = lambda rows: [r["guest_name"] for r in rows]
+
+    assert names(admin.search_bookings("ANN", controllers.ALL_HISTORY)) == ["Anna Cruz", "Joanne Reyes"]
+    assert names(admin.search_bookings("ann", controllers.CURRENT_GUESTS)) == ["Joanne Reyes"]
+    assert names(admin.search_bookings("", controllers.TODAYS_ARRIVALS)) == ["Joanne Reyes", "Mark Santos"]
+    assert len(admin.search_bookings("", controllers.ALL_HISTORY, limit=2)) == 2
+
+
+def test_query_bookings_rejects_unknown_order_column(tmp_path):
+    import pytest
+
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    with pytest.raises(ValueError):
+        database.query_bookings(order_by=["guest_name; DROP TABLE bookings"])
+
+
+def test_guest_summary_reads_rollups(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", "Day Tour")
+    book("2025-01-01", "Overnight")
+    book("2025-02-03", "Day Tour")
+
+    admin = controllers.AdminController()
+    assert admin.guest_summary("Daily") == (["01-01", "02-03"], [4, 2])
+    assert admin.guest_summary("Monthly") == (["2025-01", "2025-02"], [4, 2])
+
+
+def test_guest_summary_cached_until_bookings_change(tmp_path, monkeypatch, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", "Day Tour")
+
+    admin = controllers.AdminController()
+    assert admin.cached_guest_summary("Daily") is None
+    first = admin.guest_summary("Daily")
+    assert controllers.AdminController().cached_guest_summary("Daily") == first
+
+    calls = []
+    real_rollup = BookingModel.rollup
+    monkeypatch.setattr(BookingModel, "rollup", lambda *a, **k: calls.append(a) or real_rollup(*a, **k))
+    assert admin.guest_summary("Daily") is first
+    assert calls == []
+
+    book("2025-01-01", "Day Tour")
+    assert admin.cached_guest_summary("Daily") is None
+    assert admin.guest_summary("Daily") == (["01-01"], [4])
+    assert len(calls) == 1
+
+
+def test_guest_summary_cache_dropped_when_rollups_are_rebuilt(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", "Day Tour")
+
+    admin = controllers.AdminController()
+    assert admin.guest_summary("Daily") == (["01-01"], [2])
+    with database.get_conn() as conn:
+        conn.execute("UPDATE daily_stats SET guests = 9")
+        conn.commit()
+
+    assert database.reconcile_rollups() > 0
+    assert admin.cached_guest_summary("Daily") is None
+    assert admin.guest_summary("Daily") == (["01-01"], [2])
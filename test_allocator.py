@@ -0,0 +1,113 @@
+import random
+from itertools import combinations, product
+
+from allocator import cheapest_cover
+
+
+def _res(*specs):
+    return [{"id": i + 1, "capacity": cap, "price": price} for i, (cap, price) in enumerate(specs)]
+
+
+def _brute_force(rows, guests):
+    best = None
+    for k in range(1, len(rows) + 1):
+        for comb in combinations(rows, k):
+            cap = sum(r["capacity"] for r in comb)
+            if cap < guests:
+                continue
+            key = (round(sum(r["price"] for r in comb), 2), k, cap - guests)
+            if best is None or key < best:
+                best = key
+    return best
+
+
+def test_cheapest_cover_prefers_price_over_fewest_units():
+    rows = _res((10, 800), (5, 300), (5, 300))
+    chosen = cheapest_cover(rows, 10)
+    assert sorted(r["id"] for r in chosen) == [2, 3]  # 600 < 800
+
+
+def test_cheapest_cover_tie_breaks_on_units_then_waste():
+    rows = _res((5, 300), (5, 300), (10, 600), (12, 600))
+    assert [r["id"] for r in cheapest_cover(rows, 10)] == [3]
+
+
+def test_cheapest_cover_impossible_or_empty():
+    rows = _res((5, 300), (5, 300))
+    assert cheapest_cover(rows, 11) == []
+    assert cheapest_cover(rows, 0) == []
+    assert cheapest_cover([], 3) == []
+
+
+def test_cheapest_cover_matches_brute_force():
+    rnd = random.Random(7)
+    for _ in range(200):
+        rows = _res(*[(rnd.choice([2, 5, 6, 8, 10, 12]), rnd.choice([300, 800, 1800, 2200])) for _ in range(rnd.randint(1, 8))])
+        guests = rnd.randint(1, 40)
+        chosen = cheapest_cover(rows, guests)
+        expected = _brute_force(rows, guests)
+        if expected is None:
+            assert chosen == []
+            continue
+        cap = sum(r["capacity"] for r in chosen)
+        assert (round(sum(r["price"] for r in chosen), 2), len(chosen), cap - guests) == expected
+
+
+def test_allocate_parties_gives_disjoint_sets():
+    from allocator import allocate_parties
+
+    rows = _res((5, 300), (5, 300), (10, 800), (10, 800))
+    out = allocate_parties(rows, [4, 10, 9])
+
+    ids = [sorted(r["id"] for r in chosen) for chosen in out]
+    flat = [i for chosen in ids for i in chosen]
+    assert len(flat) == len(set(flat))
+    assert all(sum(r["capacity"] for r in chosen) >= g for chosen, g in zip(out, [4, 10, 9]))
+
+
+def test_allocate_parties_reports_unplaced_party():
+    from allocator import allocate_parties
+
+    rows = _res((5, 300), (10, 800))
+    out = allocate_parties(rows, [10, 10])
+    assert sorted(len(chosen) for chosen in out) == [0, 1]
+
+
+def test_allocate_parties_backtracks_when_cheapest_cover_blocks_a_later_party():
+    from allocator import allocate_parties
+
+    rows = _res((3, 300), (3, 300), (4, 200))
+    out = allocate_parties(rows, [6, 4])
+    assert [sorted(r["id"] for r in chosen) for chosen in out] == [[1, 2], [3]]
+
+
+def test_allocate_parties_matches_brute_force():
+    from allocator import allocate_parties
+
+    rnd = random.Random(11)
+    for _ in range(150):
+        rows = _res(*[(rnd.choice([2, 3, 4, 6]), rnd.choice([200, 300, 500])) for _ in range(rnd.randint(1, 6))])
+        parties = [rnd.randint(1, 10) for _ in range(rnd.randint(1, 3))]
+
+        best = None
+        # every resource goes to one party or stays free (index len(parties))
+        for owner in product(range(len(parties) + 1), repeat=len(rows)):
+            seated, cost = 0, 0.0
+            for p, g in enumerate(parties):
+                mine = [r for r, o in zip(rows, owner) if o == p]
+                if mine and sum(r["capacity"] for r in mine) >= g:
+                    seated += 1
+                    cost += sum(r["price"] for r in mine)
+                elif mine:
+                    break
+            else:
+                key = (-seated, round(cost, 2))
+                best = key if best is None or key < best else best
+
+        out = allocate_parties(rows, parties)
+        flat = [id(r) for chosen in out for r in chosen]
+        assert len(flat) == len(set(flat))
+        assert all(not chosen or sum(r["capacity"] for r in chosen) >= g for chosen, g in zip(out, parties))
+        seated = sum(1 for chosen in out if chosen)
+        cost = round(sum(r["price"] for chosen in out for r in chosen), 2)
+        assert (-seated, cost) == best
@@ -0,0 +1,73 @@
+import auth
+import database
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_authenticate_checks_user_and_password(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    user, error = auth.authenticate("admin", "Lresort123")
+    assert user["username"] == "admin" and error == ""
+    assert auth.authenticate("admin", "nope") == (None, "Wrong password")
+    assert auth.authenticate("ghost", "Lresort123") == (None, "Unknown user")
+
+
+def test_throttle_backs_off_after_free_attempts():
+    clock = FakeClock()
+    throttle = auth.LoginThrottle(free_attempts=2, base_delay=1.0, max_delay=5.0, clock=clock)
+
+    assert throttle.failure("admin") == 0.0
+    assert throttle.failure("Admin ") == 0.0
+    assert throttle.retry_after("admin") == 0.0
+    assert throttle.failure("admin") == 1.0
+    assert throttle.retry_after("ADMIN") == 1.0
+    assert throttle.failure("admin") == 2.0
+    assert throttle.failure("admin") == 4.0
+    assert throttle.failure("admin") == 5.0  # capped
+    assert throttle.retry_after("other") == 0.0
+
+    clock.now += 5.0
+    assert throttle.retry_after("admin") == 0.0
+    throttle.success("admin")
+    assert throttle.failure("admin") == 0.0
+
+
+def test_sessions_issue_check_and_revoke():
+    store = auth.SessionStore()
+    session = store.issue({"id": 7, "username": "desk", "is_admin": 0})
+    other = store.issue({"id": 1, "username": "admin", "is_admin": 1})
+
+    assert session.token != other.token
+    assert store.get(session.token).username == "desk"
+    assert store.is_admin(session.token) is False
+    assert store.is_admin(other.token) is True
+
+    store.revoke(other.token)
+    assert store.get(other.token) is None
+    assert store.is_admin(other.token) is False
+    assert store.is_admin(None) is False
+
+
+def test_login_rehashes_outdated_params(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth.utils, "HASH_PARAMS", auth.utils.LEGACY_HASH_PARAMS)
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    assert database.find_user("admin")["hash_params"] == auth.utils.LEGACY_HASH_PARAMS
+
+    target = "pbkdf2_sha256$rounds=1000"
+    monkeypatch.setattr(auth.utils, "HASH_PARAMS", target)
+    user, _ = auth.authenticate("admin", "Lresort123")
+    assert user is not None
+
+    stored = database.find_user("admin")
+    assert stored["hash_params"] == target
+    assert stored["password_hash"] != user["password_hash"]
+    assert auth.authenticate("admin", "Lresort123")[0] is not None
@@ -54,10 +54,13 @@ def test_calculate_total_other_package():
 
 # tests/test_booking_controller.py (add these)
 
+def _booked(tables=(), rooms=()):
+    return lambda d: {"tables": set(tables), "rooms": set(rooms)}
+
+
 def test_validate_availability_all_free(monkeypatch):
-    # monkeypatch the low-level functions used inside controllers
-    monkeypatch.setattr(controllers, "is_table_booked", lambda tid, d: False)
-    monkeypatch.setattr(controllers, "is_room_booked", lambda rid, d: False)
+    # monkeypatch the bulk availability lookup used inside controllers
+    monkeypatch.setattr(controllers, "availability_map", _booked())
 
     ctrl = controllers.BookingController()
     ok, msg = ctrl.validate_availability("2025-01-01", [1, 2], [10])
@@ -66,11 +69,8 @@ def test_validate_availability_all_free(monkeypatch):
 
 
 def test_validate_availability_table_occupied(monkeypatch):
-    def fake_table_booked(tid, d):
-        return tid == 2  # only table 2 is occupied
-
-    monkeypatch.setattr(controllers, "is_table_booked", fake_table_booked)
-    monkeypatch.setattr(controllers, "is_room_booked", lambda rid, d: False)
+    # only table 2 is occupied
+    monkeypatch.setattr(controllers, "availability_map", _booked(tables=[2]))
 
     ctrl = controllers.BookingController()
     ok, msg = ctrl.validate_availability("2025-01-01", [1, 2], [10])
@@ -79,10 +79,46 @@ def test_validate_availability_table_occupied(monkeypatch):
 
 
 def test_validate_availability_room_occupied(monkeypatch):
-    monkeypatch.setattr(controllers, "is_table_booked", lambda tid, d: False)
-    monkeypatch.setattr(controllers, "is_room_booked", lambda rid, d: rid == 5)
+    monkeypatch.setattr(controllers, "availability_map", _booked(rooms=[5]))
 
     ctrl = controllers.BookingController()
     ok, msg = ctrl.validate_availability("2025-01-01", [1], [5])
     assert ok is False
     assert "Room 5 is already booked" in msg
+
+
+def test_validate_availability_queries_once(monkeypatch):
+    calls = []
+
+    def fake_map(d):
+        calls.append(d)
+        return {"tables": set(), "rooms": set()}
+
+    monkeypatch.setattr(controllers, "availability_map", fake_map)
+
+    ctrl = controllers.BookingController()
+    ok, _ = ctrl.validate_availability("2025-01-01", [1, 2, 3], [4, 5])
+    assert ok is True
+    assert calls == ["2025-01-01"]
+
+
+def test_allocate_parties_uses_one_snapshot(tmp_path):
+    import database
+
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    ctrl = controllers.BookingController()
+    parties = [
+        {"adults": 8, "children": 2, "package": "Day Tour"},
+        {"adults": 3, "children": 0, "package": "Day Tour"},
+        {"adults": 2, "children": 2, "package": "Overnight"},
+    ]
+    out = ctrl.allocate_parties(parties, "2025-03-01")
+
+    assert all(a["ok"] for a in out)
+    table_ids = [t["id"] for a in out for t in a["tables"]]
+    assert len(table_ids) == len(set(table_ids))
+    assert out[2]["rooms"] and not out[2]["tables"]
+    assert out[1]["table_fee"] == 300.0
+    assert out[1]["total"] == 3 * 150.0 + 300.0
@@ -1,5 +1,8 @@
+import utils
+from datetime import date
 from pathlib import Path
 import database
+import pytest
 from models import BookingModel
 
 
@@ -36,4 +39,528 @@ def test_init_db_uses_temp_file(tmp_path):
     row = rows[0]
     assert row["guest_name"] == "Test Guest"
     assert row["guest_count"] == 3
-    assert row["total_amount"] == 730.0
\ No newline at end of file
+    assert row["total_amount"] == 730.0
+
+def test_get_conn_reuses_pooled_connection(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    before = database.pool_stats()
+    for _ in range(5):
+        database.find_user("admin")
+    after = database.pool_stats()
+
+    assert after["opened"] == before["opened"]
+    assert after["reused"] - before["reused"] == 5
+
+
+def test_get_conn_rolls_back_uncommitted_work(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    with database.get_conn() as conn:
+        conn.execute("UPDATE tables SET status='occupied' WHERE id=1")
+        # no commit
+
+    rows = {r["id"]: r for r in database.list_tables()}
+    assert rows[1]["status"] == "available"
+
+
+def test_close_pool_closes_connections(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    database.close_pool()
+    assert database.pool_stats()["open"] == 0
+
+    # the pool keeps working after a shutdown
+    assert len(database.list_tables()) == 11
+
+
+def test_pool_closes_connections_of_exited_threads(tmp_path):
+    import threading
+
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    database.find_user("admin")
+    before = database.pool_stats()["open"]
+
+    for _ in range(20):
+        t = threading.Thread(target=database.find_user, args=("admin",))
+        t.start()
+        t.join()
+
+    assert database.pool_stats()["open"] == before
+
+
+def test_configure_storage_does_not_close_borrowed_connections(tmp_path):
+    import threading
+
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    borrowed, switched, results = threading.Event(), threading.Event(), []
+
+    def worker():
+        with database.get_conn() as conn:
+            borrowed.set()
+            switched.wait(2)
+            results.append(conn.execute("SELECT COUNT(*) FROM tables").fetchone()[0])
+
+    t = threading.Thread(target=worker)
+    t.start()
+    borrowed.wait(2)
+    try:
+        database.configure_storage("durable")
+        switched.set()
+        t.join(2)
+        assert results == [11]  # still usable mid-query
+        assert database.pool_stats()["open"] == 0  # and closed once released
+        with database.get_conn() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    finally:
+        database.configure_storage("fast")
+
+
+def test_configure_storage_rejects_unknown_preset():
+    with pytest.raises(ValueError, match="Unknown storage profile"):
+        database.configure_storage("turbo")
+
+
+def test_connections_use_storage_profile(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.configure_storage("fast")
+    database.init_db()
+
+    with database.get_conn() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+
+def test_configure_storage_durable_preset(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    try:
+        database.configure_storage("durable", cache_size=-2000)
+        with database.get_conn() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+    finally:
+        database.configure_storage("fast")
+
+
+def test_create_booking_writes_junction_rows(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", table_id=[1, 3], room_id="2")
+
+    with database.get_conn() as conn:
+        tables = [r[0] for r in conn.execute("SELECT table_id FROM booking_tables ORDER BY table_id")]
+        rooms = [r[0] for r in conn.execute("SELECT room_id FROM booking_rooms")]
+    assert tables == [1, 3]
+    assert rooms == [2]
+
+    assert database.is_table_booked(3, "2025-01-01")
+    assert database.is_table_booked("2,3", "2025-01-01")
+    assert not database.is_table_booked(2, "2025-01-01")
+    assert not database.is_table_booked(1, "2025-01-02")
+    assert database.is_room_booked([2], "2025-01-01")
+
+
+def test_checked_out_booking_frees_resources(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", table_id=4)
+    bid = BookingModel.fetch_by_date("2025-01-01")[0]["id"]
+    BookingModel.checkout(bid)
+
+    assert not database.is_table_booked(4, "2025-01-01")
+
+
+def test_update_booking_resyncs_junction_rows(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", table_id=4)
+    bid = BookingModel.fetch_by_date("2025-01-01")[0]["id"]
+    BookingModel.update(bid, table_id=[5, 6])
+
+    assert not database.is_table_booked(4, "2025-01-01")
+    assert database.is_table_booked(6, "2025-01-01")
+    assert BookingModel.fetch_by_date("2025-01-01")[0]["table_id"] == "5,6"
+
+
+def test_init_db_migrates_csv_style_ids(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    with database.get_conn() as conn:
+        conn.execute("DELETE FROM booking_tables")
+        conn.execute(
+            "INSERT INTO bookings (guest_name, booking_date, adults, children, guest_count, package,"
+            " table_id, room_id, table_fee, room_fee, total_amount) VALUES"
+            " ('Legacy', '2024-12-24', 2, 0, 2, 'Day Tour', '7,8', NULL, 0, 0, 0)"
+        )
+        conn.execute("PRAGMA user_version=0")
+        conn.commit()
+
+    database.init_db()
+
+    assert database.is_table_booked(8, "2024-12-24")
+    with database.get_conn() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+
+
+def test_init_db_adds_hash_params_to_old_users(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    with database.get_conn() as conn:
+        conn.execute("UPDATE users SET hash_params=NULL")
+        conn.execute("PRAGMA user_version=2")
+        conn.commit()
+
+    database.init_db()
+    assert database.find_user("admin")["hash_params"] == utils.LEGACY_HASH_PARAMS
+
+
+# queries that run on every screen refresh; each must stay index-backed
+HOT_QUERIES = [
+    ("SELECT * FROM bookings WHERE booking_date=? ORDER BY id", ("2025-01-01",)),
+    (
+        "SELECT * FROM bookings WHERE booking_date BETWEEN ? AND ? ORDER BY booking_date, id",
+        ("2025-01-01", "2025-12-31"),
+    ),
+    ("SELECT id, booking_date, package FROM bookings WHERE status = 'checked-in'", ()),
+    (
+        "SELECT * FROM bookings WHERE booking_date BETWEEN ? AND ? AND (booking_date, id) > (?, ?)"
+        " ORDER BY booking_date, id LIMIT ?",
+        ("2025-01-01", "9999-12-31", "2025-01-01", 10, 500),
+    ),
+    ("SELECT id FROM bookings WHERE package=? AND status='checked-in'", ("Overnight",)),
+    (
+        "SELECT id FROM bookings WHERE status='checked-in' AND expected_checkout_at <= ? ORDER BY id",
+        ("2025-01-02 08:00:00",),
+    ),
+    ("SELECT id FROM bookings WHERE lower(guest_name) >= ? AND lower(guest_name) < ?", ("ann", "ano")),
+    (
+        "SELECT 1 FROM booking_tables j JOIN bookings b ON b.id = j.booking_id"
+        " WHERE j.booking_date=? AND j.table_id=? AND b.status='checked-in'",
+        ("2025-01-01", 1),
+    ),
+]
+
+
+def test_hot_booking_queries_use_indexes(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    database.init_db()  # index creation is idempotent
+
+    with database.get_conn() as conn:
+        for sql, params in HOT_QUERIES:
+            plan = [r["detail"] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            scans = [d for d in plan if d.startswith("SCAN")]
+            assert not scans, f"full scan in {sql!r}: {plan}"
+
+
+def test_availability_map_returns_booked_ids(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", table_id=[1, 2])
+    book("2025-01-01", room_id=3, package="Overnight")
+    book("2025-01-02", table_id=5)
+
+    booked = database.availability_map("2025-01-01")
+    assert booked == {"tables": {1, 2}, "rooms": {3}}
+    assert database.booked_resource_ids("table", "2025-01-02") == {5}
+    assert database.booked_resource_ids("room", "2025-01-02") == set()
+
+
+def test_inventory_cache_hits_and_invalidation(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    first = database.list_tables()
+    stats = database.inventory_cache_stats()
+    assert database.list_tables() is first
+    assert database.inventory_cache_stats()["hits"] == stats["hits"] + 1
+
+    database.occupy_table(1)
+    rows = {r["id"]: r for r in database.list_tables()}
+    assert rows[1]["status"] == "occupied"
+    assert database.inventory_cache_stats()["version"] > stats["version"]
+
+
+def test_cached_inventory_records_are_read_only(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    table = database.list_tables()[0]
+    with pytest.raises(AttributeError):
+        table.status = "occupied"
+    with pytest.raises(AttributeError):
+        del table.name
+    assert database.list_tables()[0].status == "available"
+
+    copy = table._asdict()
+    copy["status"] = "occupied"
+    assert database.list_tables()[0].status == "available"
+
+
+def test_inventory_cache_is_per_database(tmp_path):
+    database.DB_PATH = tmp_path / "a.db"
+    database.init_db()
+    database.occupy_room(2)
+
+    database.DB_PATH = tmp_path / "b.db"
+    database.init_db()
+    rows = {r["id"]: r for r in database.list_rooms()}
+    assert rows[2]["status"] == "available"
+
+
+def test_fetch_returns_slotted_records(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", table_id=[1, 2], name="Record Guest")
+
+    b = database.fetch_bookings_range("2025-01-01", "2025-01-31")[0]
+    assert isinstance(b, database.Booking)
+    assert not hasattr(b, "__dict__")
+    assert b.guest_name == b["guest_name"] == "Record Guest"
+    assert b.booking_date == date(2025, 1, 1)
+    assert b.table_id == "1,2"
+    assert dict(b)["guest_count"] == 2
+
+    t = database.list_tables()[0]
+    assert isinstance(t, database.Table)
+    assert t.capacity == t["capacity"]
+
+
+def test_search_guests_substring_prefix_and_typos(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    for name in ("Joanne Reyes", "Anna Cruz", "Mark Santos"):
+        book("2025-01-01", name=name)
+
+    names = lambda rows: sorted(r.guest_name for r in rows)
+    assert names(database.search_guests("ann")) == ["Anna Cruz", "Joanne Reyes"]
+    assert names(database.search_guests("SANTOS")) == ["Mark Santos"]
+    assert names(database.search_guests("ma")) == ["Mark Santos"]
+    assert names(database.search_guests("Jonne")) == ["Joanne Reyes"]
+    assert database.search_guests("Jonne", fuzzy=False) == []
+    assert database.search_guests("zzzz") == []
+
+
+def test_search_index_follows_updates(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", name="Old Name")
+    bid = BookingModel.fetch_by_date("2025-01-01")[0]["id"]
+
+    BookingModel.update(bid, guest_name="Brand New")
+
+    assert database.search_guests("old name", fuzzy=False) == []
+    assert [r.id for r in database.search_guests("brand")] == [bid]
+    assert [r.id for r in database.query_bookings(search="AND NE")] == [bid]
+
+
+def test_search_index_follows_fts_columns(tmp_path, monkeypatch, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", name="Ana Cruz", package="Overnight")
+
+    monkeypatch.setattr(database, "FTS_COLUMNS", ("guest_name", "package"))
+    database.rebuild_search_index()
+    book("2025-01-02", name="Ben Reyes", package="Overnight")
+
+    with database.get_conn() as conn:
+        assert [r[1] for r in conn.execute("PRAGMA table_info(bookings_fts)")] == ["guest_name", "package"]
+    found = database.query_bookings(search="overnight")
+    assert sorted(r["guest_name"] for r in found) == ["Ana Cruz", "Ben Reyes"]
+
+
+def _rollup_snapshot():
+    with database.get_conn() as conn:
+        return {
+            table: sorted(tuple(r) for r in conn.execute(f"SELECT * FROM {table}"))
+            for table in ("daily_stats", "monthly_stats")
+        }
+
+
+def test_rollups_follow_every_write(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-01-01", table_id=1)
+    book("2025-01-01", room_id=1, package="Overnight")
+    book("2025-01-15", table_id=2)
+    book("2025-02-01", table_id=3)
+    ids = [r["id"] for r in BookingModel.fetch_range("2025-01-01", "2025-12-31")]
+
+    BookingModel.update(ids[0], adults=5, guest_count=5, total_amount=900.0)
+    BookingModel.update(ids[2], booking_date="2025-01-20")
+    BookingModel.cancel(ids[3])
+    BookingModel.add_payment(ids[1], 250.0)
+
+    incremental = _rollup_snapshot()
+    database.rebuild_rollups()
+    assert _rollup_snapshot() == incremental
+
+    days = {r["period"]: r for r in database.fetch_rollup("day")}
+    assert sorted(days) == ["2025-01-01", "2025-01-20"]
+    assert days["2025-01-01"]["bookings"] == 2
+    assert days["2025-01-01"]["guests"] == 7
+    assert days["2025-01-01"]["revenue"] == 900.0
+    assert days["2025-01-01"]["amount_paid"] == 250.0
+
+    months = database.fetch_rollup("month")
+    assert [(r["period"], r["bookings"]) for r in months] == [("2025-01", 3)]
+
+
+def test_rebuild_rollups_command(tmp_path, book):
+    path = tmp_path / "cli.db"
+    database.DB_PATH = path
+    database.init_db()
+    book("2025-03-01", table_id=1)
+    with database.get_conn() as conn:
+        conn.execute("DELETE FROM daily_stats")
+        conn.commit()
+
+    database.main(["--db", str(path), "rebuild-rollups"])
+
+    assert [r["bookings"] for r in database.fetch_rollup("day")] == [1]
+
+
+def test_reconcile_rollups_repairs_drift_only(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-03-01", table_id=1)
+    book("2025-03-02", room_id=1, package="Overnight")
+    assert database.reconcile_rollups() == 0
+
+    expected = _rollup_snapshot()
+    with database.get_conn() as conn:
+        conn.execute("UPDATE daily_stats SET guests = guests + 1 WHERE day = '2025-03-01'")
+        conn.execute("DELETE FROM monthly_stats")
+        conn.commit()
+
+    assert database.reconcile_rollups() > 0
+    assert _rollup_snapshot() == expected
+    assert database.reconcile_rollups() == 0
+
+
+def test_import_bookings_csv_loads_valid_rows_and_reports_bad_ones(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", table_id=1, name="Existing Guest")
+
+    src = tmp_path / "season.csv"
+    src.write_text(
+        ",".join(database.BOOKING_CSV_COLUMNS) + "\n"
+        "90,Maria Clara,2025-03-01,2,1,3,Overnight,\"2,3\",1,900,500,checked-out\n"
+        "91,No Date,,2,0,2,Day Tour,,,0,0,checked-in\n"
+        "92,Bad Table,2025-03-02,2,0,2,Day Tour,999,,0,0,checked-in\n"
+        "93,Bad Adults,2025-03-02,two,0,2,Day Tour,,,0,0,checked-in\n"
+        "94,Juan Luna,2025-03-02,1,0,1,Day Tour,4,,150,150,\n"
+        "95,Bad Status,2025-03-02,1,0,1,Day Tour,,,0,0,lost\n"
+        "96,Basic Date,20250302,1,0,1,Day Tour,,,0,0,checked-out\n"
+        "97,Week Date,2025-W01-3,1,0,1,Day Tour,,,0,0,checked-out\n",
+        encoding="utf-8",
+    )
+    report = database.import_bookings_csv(str(src), chunk_size=1)
+
+    assert report["imported"] == 2
+    assert [line for line, _ in report["errors"]] == [3, 4, 5, 7, 8, 9]
+    assert all("YYYY-MM-DD" in message for _, message in report["errors"][-2:])
+    assert "unknown table 999" in report["errors"][1][1]
+
+    maria, juan = database.search_guests("maria clara")[0], database.search_guests("juan luna")[0]
+    assert maria.id > 1 and juan.id == maria.id + 1  # file ids are not reused
+    assert maria.table_id == "2,3" and maria.room_id == "1" and maria.guest_count == 3
+    assert maria.status == "checked-out"
+    assert str(maria.expected_checkout_at) == "2025-03-02 08:00:00"
+    # no status in the file: history, so not a current guest holding table 4
+    assert juan.status == "checked-out" and juan.expected_checkout_at is None
+    assert database.booked_resource_ids("table", "2025-03-02") == set()
+    with database.get_conn() as conn:
+        tables = conn.execute("SELECT table_id, booking_date FROM booking_tables WHERE booking_id=?", (maria.id,))
+        assert sorted(tuple(r) for r in tables) == [(2, "2025-03-01"), (3, "2025-03-01")]
+        rooms = conn.execute("SELECT room_id FROM booking_rooms WHERE booking_id=?", (maria.id,))
+        assert [r[0] for r in rooms] == [1]
+
+    incremental = _rollup_snapshot()
+    database.rebuild_rollups()
+    assert _rollup_snapshot() == incremental
+
+
+def test_import_does_not_reuse_ids_of_deleted_bookings(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", table_id=1)
+    book("2025-01-02", table_id=2)
+    with database.get_conn() as conn:
+        conn.execute("DELETE FROM bookings WHERE id = 2")  # junction row for id 2 stays behind
+        conn.commit()
+
+    src = tmp_path / "late.csv"
+    src.write_text(
+        ",".join(database.BOOKING_CSV_COLUMNS) + "\n"
+        "1,Late Guest,2025-02-01,1,0,1,Day Tour,,,0,0,checked-out\n",
+        encoding="utf-8",
+    )
+    assert database.import_bookings_csv(str(src))["imported"] == 1
+
+    guest = database.search_guests("late guest")[0]
+    assert guest.id == 3
+    with database.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM booking_tables WHERE booking_id = ?", (guest.id,)).fetchone()[0] == 0
+
+
+def test_import_reads_its_own_export(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    book("2025-01-01", table_id=1, name="Ana Cruz")
+    book("2025-01-02", room_id=2, package="Overnight", name="Ben Reyes")
+    out = tmp_path / "out.csv"
+    database.export_bookings_csv(database.fetch_bookings_range("2025-01-01", "2025-01-31"), str(out))
+
+    report = database.import_bookings_csv(str(out), defer_indexes=True)
+
+    assert report["imported"] == 2 and report["errors"] == []
+    rows = database.fetch_bookings_range("2025-01-01", "2025-01-31")
+    assert sorted((r["guest_name"], str(r["booking_date"])) for r in rows) == [
+        ("Ana Cruz", "2025-01-01"), ("Ana Cruz", "2025-01-01"),
+        ("Ben Reyes", "2025-01-02"), ("Ben Reyes", "2025-01-02"),
+    ]
+    with database.get_conn() as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert set(database.BOOKING_INDEXES) <= names
+
+
+def test_export_bookings_streams_filtered_columns(tmp_path, book):
+    import csv
+    import gzip
+
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+    for day, name in [("2025-01-01", "Ana Cruz"), ("2025-01-05", "Ben Reyes"),
+                      ("2025-01-05", "Carla Santos"), ("2025-02-01", "Dan Flores")]:
+        book(day, name=name)
+
+    out = tmp_path / "jan.csv.gz"
+    report = database.export_bookings(str(out), columns=["guest_name", "booking_date"],
+                                      date_from="2025-01-02", date_to="2025-01-31", chunk_size=1)
+
+    assert report["rows"] == 2 and report["rows_per_sec"] > 0
+    with gzip.open(out, "rt", newline="", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [
+            ["guest_name", "booking_date"],
+            ["Ben Reyes", "2025-01-05"],
+            ["Carla Santos", "2025-01-05"],
+        ]
+
+    plain = tmp_path / "all.csv"
+    assert database.export_bookings(str(plain))["rows"] == 4
+    assert database.import_bookings_csv(str(plain))["imported"] == 4
+
+    with pytest.raises(ValueError, match="password_hash"):
+        database.export_bookings(str(plain), columns=["guest_name", "password_hash"])
@@ -0,0 +1,31 @@
+import database
+from models import OccupancyCalendar, TableModel, RoomModel
+
+
+def test_occupancy_calendar_bits():
+    cal = OccupancyCalendar([1, 2, 3], "2025-01-30", "2025-02-02", [(1, "2025-01-31"), (3, "2025-02-02"), (3, "2025-03-01")])
+
+    assert cal.dates == ["2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02"]
+    assert cal.is_booked(1, "2025-01-31")
+    assert not cal.is_booked(1, "2025-02-01")
+    assert cal.booked_dates(3) == ["2025-02-02"]  # out-of-range booking ignored
+    assert cal.free_ids("2025-01-31") == [2, 3]
+    assert cal.free_all_range() == [2]
+    assert cal.rows()[0] == [False, True, False, False]
+
+
+def test_table_and_room_calendar(tmp_path, book):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    book("2025-06-01", table_id=[1, 2])
+    book("2025-06-03", room_id=4, package="Overnight")
+
+    tables = TableModel.calendar("2025-06-01", "2025-08-29")
+    assert len(tables.dates) == 90
+    assert len(tables.resource_ids) == 11
+    assert tables.booked_count("2025-06-01") == 2
+    assert tables.booked_count("2025-06-02") == 0
+
+    rooms = RoomModel.calendar("2025-06-01", "2025-06-07")
+    assert rooms.booked_dates(4) == ["2025-06-03"]
@@ -0,0 +1,71 @@
+import database
+import scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_run_pending_respects_intervals():
+    clock = FakeClock()
+    sched = scheduler.Scheduler(clock=clock)
+    calls = []
+    sched.add_job("a", lambda: calls.append("a") or 1, interval=10)
+    sched.add_job("b", lambda: calls.append("b"), interval=10, run_now=False)
+
+    assert sched.run_pending() == 1
+    assert calls == ["a"]
+    assert sched.results.get_nowait()[:3] == ("a", 1, None)
+
+    clock.now = 10
+    sched.run_pending()
+    assert sorted(calls) == ["a", "a", "b"]
+    assert sched.stats()["a"]["runs"] == 2
+
+
+def test_failing_job_is_recorded_not_raised():
+    sched = scheduler.Scheduler(clock=FakeClock())
+
+    def boom():
+        raise RuntimeError("nope")
+
+    sched.add_job("boom", boom, interval=5)
+    sched.run_pending()
+
+    name, result, error, elapsed = sched.results.get_nowait()
+    assert name == "boom" and result is None
+    assert "nope" in error
+    assert sched.stats()["boom"]["errors"] == 1
+    assert elapsed >= 0
+
+
+def test_scheduler_thread_runs_jobs_and_stops():
+    sched = scheduler.Scheduler()
+    sched.add_job("tick", lambda: "ok", interval=60)
+    sched.start()
+    try:
+        name, result, error, _ = sched.results.get(timeout=2)
+    finally:
+        sched.stop()
+    assert (name, result, error) == ("tick", "ok", None)
+
+
+def test_build_scheduler_standard_jobs(tmp_path):
+    database.DB_PATH = tmp_path / "test_resort.db"
+    database.init_db()
+
+    sched = scheduler.build_scheduler({"overdue_checkouts": 1})
+    assert set(sched.stats()) == set(scheduler.DEFAULT_INTERVALS)
+    assert sched.stats()["overdue_checkouts"]["interval"] == 1
+
+    sched.run_pending()
+    results = {}
+    while not sched.results.empty():
+        name, result, error, _ = sched.results.get_nowait()
+        assert error is None
+        results[name] = result
+    assert results == {"overdue_checkouts": []}
@@ -0,0 +1,105 @@
+from tree_grid import GridUpdater, VirtualGrid
+
+
+class FakeTree:
+    """Records Treeview calls and keeps the item order like ttk does."""
+
+    def __init__(self):
+        self.items = {}
+        self.order = []
+        self.calls = []
+
+    def insert(self, parent, index, iid, values, tags):
+        self.calls.append(("insert", iid))
+        self.items[iid] = (values, tags)
+        self.order.insert(index, iid)
+
+    def delete(self, *iids):
+        self.calls.append(("delete",) + iids)
+        for iid in iids:
+            del self.items[iid]
+            self.order.remove(iid)
+
+    def move(self, iid, parent, index):
+        self.calls.append(("move", iid))
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def item(self, iid, values, tags):
+        self.calls.append(("item", iid))
+        self.items[iid] = (values, tags)
+
+    def configure(self, **kw):
+        pass
+
+    def yview(self, *args):
+        pass
+
+
+class FakeScrollbar:
+    def __init__(self):
+        self.command = None
+        self.position = None
+
+    def config(self, command):
+        self.command = command
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def _rows(*specs):
+    return [{"id": i, "name": n} for i, n in specs]
+
+
+def _updater(tree):
+    return GridUpdater(tree, lambda r: [r["id"], r["name"]], lambda r, i: ("even" if i % 2 == 0 else "odd",))
+
+
+def test_update_only_touches_changed_rows():
+    tree = FakeTree()
+    up = _updater(tree)
+    up.update(_rows((1, "a"), (2, "b"), (3, "c")))
+    tree.calls.clear()
+
+    stats = up.update(_rows((1, "a"), (3, "c2"), (4, "d")))
+
+    assert tree.order == ["1", "3", "4"]
+    assert stats == {"inserted": 1, "updated": 1, "removed": 1, "moved": 0}
+    assert ("item", "1") not in tree.calls
+    assert tree.items["3"] == ((3, "c2"), ("odd",))
+
+
+def test_update_reorders_rows():
+    tree = FakeTree()
+    up = _updater(tree)
+    up.update(_rows((1, "a"), (2, "b"), (3, "c")))
+    up.update(_rows((3, "c"), (1, "a"), (2, "b")))
+    assert tree.order == ["3", "1", "2"]
+
+
+def test_virtual_grid_materialises_only_the_window():
+    tree, bar = FakeTree(), FakeScrollbar()
+    grid = VirtualGrid(tree, bar, _updater(tree), threshold=50, page_size=10)
+    rows = _rows(*[(i, f"guest {i}") for i in range(1000)])
+
+    grid.set_rows(rows)
+    assert grid.virtual and len(tree.order) == 10
+    assert bar.command == grid.yview
+
+    grid.yview("moveto", "0.5")
+    assert tree.order[0] == "500" and len(tree.order) == 10
+    assert tree.items["500"][1] == ("even",)  # stripes follow the absolute index
+    assert bar.position == (0.5, 0.51)
+
+    grid.yview("scroll", "1", "pages")
+    assert tree.order[0] == "510"
+    grid.yview("moveto", "1.0")
+    assert tree.order[-1] == "999"
+
+
+def test_small_result_sets_render_everything():
+    tree, bar = FakeTree(), FakeScrollbar()
+    grid = VirtualGrid(tree, bar, _updater(tree), threshold=50, page_size=10)
+    grid.set_rows(_rows(*[(i, "x") for i in range(20)]))
+    assert not grid.virtual and len(tree.order) == 20
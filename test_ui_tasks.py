@@ -0,0 +1,140 @@
+import threading
+import time
+
+from ui_tasks import LatestOnly, TaskExecutor
+
+
+class FakeTk:
+    """Just enough of Tk's after() to drive callbacks by hand."""
+
+    def __init__(self):
+        self.now = 0
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        self.timers[self.next_id] = (self.now + ms, func, args)
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def advance(self, ms):
+        self.now += ms
+        while True:
+            due = sorted((t, i) for i, (t, _, _) in self.timers.items() if t <= self.now)
+            if not due:
+                return
+            _, i = due[0]
+            _, func, args = self.timers.pop(i)
+            func(*args)
+
+    def run_until(self, predicate, timeout=2.0):
+        end = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < end:
+            time.sleep(0.005)
+            self.advance(TaskExecutor.POLL_MS)
+
+
+def test_keystrokes_coalesce_into_one_query():
+    tk = FakeTk()
+    results, calls = [], []
+    runner = LatestOnly(tk, results.append, delay_ms=200)
+
+    def search(text):
+        calls.append(text)
+        return text.upper()
+
+    for i, text in enumerate(["j", "jo", "joa", "joan"]):
+        runner.submit(search, text)
+        tk.advance(50)
+    tk.advance(200)
+    tk.run_until(lambda: results)
+
+    assert calls == ["joan"]
+    assert results == ["JOAN"]
+
+
+def test_stale_results_are_dropped():
+    tk = FakeTk()
+    results = []
+    runner = LatestOnly(tk, results.append, delay_ms=0)
+    release = threading.Event()
+
+    def slow(text):
+        release.wait(2)
+        return text
+
+    runner.submit(slow, "old")
+    tk.advance(0)  # "old" is now running on the worker
+    runner.submit(lambda text: text, "new")
+    tk.advance(0)
+    release.set()
+    tk.run_until(lambda: results)
+    tk.run_until(lambda: runner.executor.pending == 0)
+
+    assert results == ["new"]
+
+
+def test_errors_go_to_on_error():
+    tk = FakeTk()
+    errors = []
+    runner = LatestOnly(tk, lambda r: None, delay_ms=0, on_error=errors.append)
+
+    def boom():
+        raise RuntimeError("db down")
+
+    runner.submit(boom)
+    tk.advance(0)
+    tk.run_until(lambda: errors)
+    assert str(errors[0]) == "db down"
+
+
+def test_executor_dispatches_results_and_busy_state():
+    tk = FakeTk()
+    busy, done = [], []
+    ex = TaskExecutor(tk, on_busy=busy.append)
+    button = []
+
+    ex.submit(lambda a, b: a + b, 2, 3, on_done=done.append, busy=button.append)
+    assert busy == [True] and button == [True]
+    tk.run_until(lambda: done)
+
+    assert done == [5]
+    assert busy == [True, False] and button == [True, False]
+    ex.shutdown()
+
+
+def test_cancelled_task_never_calls_back():
+    tk = FakeTk()
+    done = []
+    ex = TaskExecutor(tk, max_workers=1)
+    gate = threading.Event()
+
+    ex.submit(gate.wait, 2)
+    task = ex.submit(lambda: "late", on_done=done.append)
+    task.cancel()
+    gate.set()
+    tk.run_until(lambda: ex.pending == 0)
+
+    assert done == []
+    ex.shutdown()
+
+
+def test_failing_callback_does_not_stop_later_results():
+    tk = FakeTk()
+    done = []
+    ex = TaskExecutor(tk, max_workers=1)
+
+    def broken(_result):
+        raise ValueError("bad widget")
+
+    ex.submit(lambda: 1, on_done=broken)
+    tk.run_until(lambda: ex.pending == 0)
+    ex.submit(lambda: 2, on_done=done.append)
+    tk.run_until(lambda: done)
+
+    assert done == [2]
+    assert ex.pending == 0
+    ex.shutdown()
@@ -36,3 +36,41 @@ def test_hash_and_verify_password_roundtrip():
 
     assert utils.verify_password(pw, salt_hex, hash_hex) is True
     assert utils.verify_password("WrongPass", salt_hex, hash_hex) is False
+
+
+def test_scrypt_params_roundtrip():
+    params = utils.format_hash_params("scrypt", n=2 ** 10, r=8, p=1)
+    salt_hex, hash_hex = utils.hash_password("Secret123", params=params)
+    assert utils.verify_password("Secret123", salt_hex, hash_hex, params) is True
+    assert utils.verify_password("Secret123", salt_hex, hash_hex) is False  # legacy pbkdf2
+
+
+def test_needs_rehash_compares_parsed_params():
+    assert utils.needs_rehash("pbkdf2_sha256$rounds=100000", "pbkdf2_sha256") is False
+    assert utils.needs_rehash("pbkdf2_sha256$rounds=50000", "pbkdf2_sha256$rounds=100000") is True
+    assert utils.needs_rehash("pbkdf2_sha256$rounds=100000", "scrypt$n=16384,r=8,p=1") is True
+    assert utils.needs_rehash("md5$x=1", "pbkdf2_sha256") is True
+
+
+def test_calibrate_hash_params_returns_usable_params():
+    params = utils.calibrate_hash_params(target_ms=1, algorithm="scrypt")
+    algorithm, values = utils.parse_hash_params(params)
+    assert algorithm == "scrypt" and values["n"] >= 2 ** 12
+    assert utils.parse_hash_params(utils.calibrate_hash_params(target_ms=1))[1]["rounds"] >= utils.PBKDF2_ROUNDS
+
+
+def test_default_params_roundtrip_when_target_changes(monkeypatch):
+    monkeypatch.setattr(utils, "HASH_PARAMS", "pbkdf2_sha256$rounds=1000")
+    salt_hex, hash_hex = utils.hash_password("Secret123")
+    assert utils.verify_password("Secret123", salt_hex, hash_hex) is True
+
+
+def test_invalid_hash_params_env_fails_at_import(monkeypatch):
+    import importlib
+    import pytest
+
+    monkeypatch.setenv("RESORT_HASH_PARAMS", "pbkdf2_sha256$round=5")
+    with pytest.raises(ValueError, match="RESORT_HASH_PARAMS"):
+        importlib.reload(utils)
+    monkeypatch.delenv("RESORT_HASH_PARAMS")
+    importlib.reload(utils)
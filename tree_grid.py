@@ -0,0 +1,140 @@
+"""Incremental and virtualized rendering for ttk.Treeview result grids."""
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+class GridUpdater:
+    """
+    Apply a new result set to a Treeview by diffing it against what is shown.
+
+    Items use the row key (booking id) as their iid, so unchanged rows are left
+    alone, changed rows are updated in place and only new / vanished rows are
+    inserted / deleted. Selection and scroll position survive a refresh.
+    """
+
+    def __init__(
+        self,
+        tree,
+        row_values: Callable[[Any], Sequence[Any]],
+        row_tags: Callable[[Any, int], Tuple[str, ...]],
+        key: Callable[[Any], Any] = lambda r: r["id"],
+    ):
+        self.tree = tree
+        self.row_values = row_values
+        self.row_tags = row_tags
+        self.key = key
+        self._shown: Dict[str, tuple] = {}  # iid -> (values, tags)
+        self._order: List[str] = []
+
+    def update(self, rows: Sequence[Any], start: int = 0) -> Dict[str, int]:
+        """Make the tree show rows (in order); start is the absolute index of rows[0]."""
+        stats = {"inserted": 0, "updated": 0, "removed": 0, "moved": 0}
+        new = []
+        for i, r in enumerate(rows):
+            new.append((str(self.key(r)), (tuple(self.row_values(r)), tuple(self.row_tags(r, start + i)))))
+        wanted = {iid for iid, _ in new}
+
+        gone = [iid for iid in self._order if iid not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                del self._shown[iid]
+            self._order = [iid for iid in self._order if iid in wanted]
+            stats["removed"] = len(gone)
+
+        order = self._order
+        for i, (iid, state) in enumerate(new):
+            values, tags = state
+            old = self._shown.get(iid)
+            if old is None:
+                self.tree.insert("", i, iid=iid, values=values, tags=tags)
+                order.insert(i, iid)
+                stats["inserted"] += 1
+            else:
+                if i >= len(order) or order[i] != iid:
+                    self.tree.move(iid, "", i)
+                    order.remove(iid)
+                    order.insert(i, iid)
+                    stats["moved"] += 1
+                if old != state:
+                    self.tree.item(iid, values=values, tags=tags)
+                    stats["updated"] += 1
+            self._shown[iid] = state
+        return stats
+
+    def clear(self) -> None:
+        if self._order:
+            self.tree.delete(*self._order)
+        self._order = []
+        self._shown = {}
+
+
+class VirtualGrid:
+    """
+    Keep the full result list in Python and only materialise the visible window.
+
+    Up to `threshold` rows everything is rendered and the Treeview scrolls
+    itself. Above it, the scrollbar is driven from here and only `page_size`
+    rows (about one screenful) exist in the tree at any time.
+    """
+
+    def __init__(self, tree, scrollbar, updater: GridUpdater, threshold: int = 2000, page_size: int = 30):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.updater = updater
+        self.threshold = threshold
+        self.page_size = page_size
+        self.rows: Sequence[Any] = []
+        self.offset = 0
+        self.virtual = False
+
+    def set_rows(self, rows: Sequence[Any]) -> None:
+        self.rows = rows
+        virtual = len(rows) > self.threshold
+        if virtual != self.virtual:
+            self.virtual = virtual
+            self.updater.clear()
+            if virtual:
+                self.scrollbar.config(command=self.yview)
+                self.tree.configure(yscrollcommand="")
+            else:
+                self.scrollbar.config(command=self.tree.yview)
+                self.tree.configure(yscrollcommand=self.scrollbar.set)
+        if virtual:
+            self.scroll_to(self.offset)
+        else:
+            self.offset = 0
+            self.updater.update(rows)
+
+    def scroll_to(self, first: int) -> None:
+        last_start = max(0, len(self.rows) - self.page_size)
+        self.offset = max(0, min(int(first), last_start))
+        window = self.rows[self.offset:self.offset + self.page_size]
+        self.updater.update(window, start=self.offset)
+        total = len(self.rows) or 1
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_size) / total))
+
+    def yview(self, *args) -> None:
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if not self.virtual or not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.page_size if args[2] == "pages" else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        if not self.virtual:
+            return None
+        delta = getattr(event, "delta", 0)
+        if getattr(event, "num", None) in (4, 5):  # X11 buttons
+            delta = 120 if event.num == 4 else -120
+        self.scroll_to(self.offset - (3 if delta > 0 else -3))
+        return "break"
+
+    def on_resize(self, event, row_height: int) -> None:
+        rows = max(1, event.height // row_height)
+        if rows != self.page_size:
+            self.page_size = rows
+            if self.virtual:
+                self.scroll_to(self.offset)
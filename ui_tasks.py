@@ -0,0 +1,176 @@
+"""Helpers for running database work off the Tk main thread."""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class Task:
+    """Handle for a submitted job. cancel() stops its callbacks from ever running."""
+
+    def __init__(self, future, busy: Optional[Callable[[bool], None]]):
+        self.future = future
+        self.busy = busy
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.future.cancel()  # only prevents jobs that have not started yet
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class TaskExecutor:
+    """
+    Thread pool for database / report work plus a Tk-side result dispatcher.
+
+    Jobs run on pool threads; their results are queued and handed to
+    on_done / on_error from Tk's after() loop, so callbacks may touch widgets.
+    on_busy(True/False) fires when the first job starts / the last one ends,
+    and each submit() can pass its own busy callback (e.g. to disable a button).
+
+    widget only needs Tk's after().
+    """
+
+    POLL_MS = 30
+
+    def __init__(self, widget, max_workers: int = 2, on_busy: Optional[Callable[[bool], None]] = None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resort-task")
+        self._done: "queue.Queue[tuple]" = queue.Queue()
+        self.pending = 0
+        self._polling = False
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        busy: Optional[Callable[[bool], None]] = None,
+    ) -> Task:
+        task = Task(None, busy)
+
+        def run():
+            if task.cancelled:
+                self._done.put((task, None, None, None, None))
+                return
+            try:
+                self._done.put((task, func(*args), None, on_done, on_error))
+            except Exception as e:
+                self._done.put((task, None, e, on_done, on_error))
+
+        task.future = self._pool.submit(run)
+        # a future cancelled before it started never runs run(); still account for it
+        task.future.add_done_callback(lambda f: f.cancelled() and self._done.put((task, None, None, None, None)))
+        self.pending += 1
+        if self.pending == 1 and self.on_busy:
+            self.on_busy(True)
+        if busy:
+            busy(True)
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+        return task
+
+    def _finish(self, task: Task) -> None:
+        self.pending -= 1
+        if task.busy:
+            task.busy(False)
+        if self.pending == 0 and self.on_busy:
+            self.on_busy(False)
+
+    def _poll(self) -> None:
+        try:
+            while True:
+                try:
+                    task, result, error, on_done, on_error = self._done.get_nowait()
+                except queue.Empty:
+                    break
+                self._finish(task)
+                if task.cancelled:
+                    continue
+                # a failing callback must not stop delivery for every later task
+                try:
+                    if error is not None:
+                        if on_error:
+                            on_error(error)
+                        else:
+                            print(f"Background task failed: {error!r}")
+                    elif on_done:
+                        on_done(result)
+                except Exception as e:
+                    print(f"Background task callback failed: {e!r}")
+        finally:
+            if self.pending > 0:
+                self.widget.after(self.POLL_MS, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class LatestOnly:
+    """
+    Debounced background runner for search-as-you-type.
+
+    submit() restarts a short debounce window; when it expires the call runs
+    on a TaskExecutor. Its result is handed to on_result on the Tk thread,
+    but only if no newer submit() happened in the meantime, so a slow query
+    for "Jo" can never overwrite the results for "Joanne".
+
+    widget only needs Tk's after() / after_cancel().
+    """
+
+    def __init__(
+        self,
+        widget,
+        on_result: Callable[[Any], None],
+        delay_ms: int = 250,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        executor: Optional[TaskExecutor] = None,
+    ):
+        self.widget = widget
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.generation = 0
+        self._timer = None
+        # one worker by default: queries for the same grid never race each other
+        self.executor = executor or TaskExecutor(widget, max_workers=1)
+        self._task: Optional[Task] = None
+
+    def submit(self, func: Callable[..., Any], *args, delay_ms: Optional[int] = None) -> int:
+        """Schedule func(*args); supersedes anything submitted before. Returns its generation."""
+        self.cancel()
+        delay = self.delay_ms if delay_ms is None else delay_ms
+        self._timer = self.widget.after(delay, self._launch, self.generation, func, args)
+        return self.generation
+
+    def cancel(self) -> None:
+        """Drop the pending call and ignore any result still in flight."""
+        self.generation += 1
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _launch(self, gen: int, func, args) -> None:
+        self._timer = None
+        if gen != self.generation:
+            return
+
+        def deliver(result):
+            if gen == self.generation:
+                self.on_result(result)
+
+        def fail(error):
+            if gen == self.generation and self.on_error:
+                self.on_error(error)
+
+        self._task = self.executor.submit(func, *args, on_done=deliver, on_error=fail)
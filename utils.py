@@ -1,22 +1,113 @@
 import hashlib
 import os
 import binascii
+import hmac
+import time
 from typing import Tuple
 import re
 
 
 PBKDF2_ROUNDS = 100_000
 
-def hash_password(password: str, salt: bytes = None) -> Tuple[str, str]:
+# Per-user hash parameters are stored as "<algorithm>$k=v,...", e.g.
+#   pbkdf2_sha256$rounds=100000      scrypt$n=16384,r=8,p=1
+# Rows from before the users.hash_params column are pbkdf2 at PBKDF2_ROUNDS.
+LEGACY_HASH_PARAMS = f"pbkdf2_sha256$rounds={PBKDF2_ROUNDS}"
+
+# What new and re-hashed passwords use. Override with RESORT_HASH_PARAMS
+# (e.g. a value printed by calibrate_hash_params()).
+HASH_PARAMS = os.environ.get("RESORT_HASH_PARAMS", LEGACY_HASH_PARAMS)
+
+# algorithm -> its parameters and their defaults
+HASH_ALGORITHMS = {
+    "pbkdf2_sha256": {"rounds": PBKDF2_ROUNDS},
+    "scrypt": {"n": 2 ** 14, "r": 8, "p": 1},
+}
+
+
+def parse_hash_params(params: str) -> Tuple[str, dict]:
+    """("pbkdf2_sha256", {"rounds": 100000}) from a stored parameter string."""
+    algorithm, _, args = (params or LEGACY_HASH_PARAMS).partition("$")
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unknown password hash algorithm {algorithm!r}")
+    values = dict(HASH_ALGORITHMS[algorithm])
+    for item in filter(None, args.split(",")):
+        key, _, value = item.partition("=")
+        key = key.strip()
+        if key not in values:
+            raise ValueError(f"Unknown {algorithm} parameter {key!r}")
+        values[key] = int(value)
+    return algorithm, values
+
+
+def format_hash_params(algorithm: str, **values: int) -> str:
+    params = algorithm + "$" + ",".join(f"{k}={v}" for k, v in values.items())
+    parse_hash_params(params)  # validates the name and keys
+    return params
+
+
+def _derive(password: str, salt: bytes, params: str) -> bytes:
+    algorithm, v = parse_hash_params(params)
+    if algorithm == "scrypt":
+        # headroom over the 128*n*r bytes scrypt needs
+        maxmem = 256 * v["n"] * v["r"] * v["p"] + (1 << 20)
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=v["n"], r=v["r"], p=v["p"],
+                              maxmem=maxmem, dklen=32)
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, v["rounds"])
+
+
+def hash_password(password: str, salt: bytes = None, params: str = None) -> Tuple[str, str]:
+    """(salt, hash) as hex using params (default HASH_PARAMS); store the params alongside them."""
     if salt is None:
         salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ROUNDS)
+    dk = _derive(password, salt, params or HASH_PARAMS)
     return binascii.hexlify(salt).decode(), binascii.hexlify(dk).decode()
 
-def verify_password(password: str, salt_hex: str, hash_hex: str) -> bool:
+def verify_password(password: str, salt_hex: str, hash_hex: str, params: str = None) -> bool:
+    """params are the ones the hash was made with; the default matches hash_password's."""
     salt = binascii.unhexlify(salt_hex)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, PBKDF2_ROUNDS)
-    return binascii.hexlify(dk).decode() == hash_hex
+    dk = _derive(password, salt, params or HASH_PARAMS)
+    return hmac.compare_digest(binascii.hexlify(dk).decode(), hash_hex)
+
+def needs_rehash(params: str, target: str = None) -> bool:
+    """True when a stored hash was made with other parameters than the current target."""
+    try:
+        return parse_hash_params(params) != parse_hash_params(target or HASH_PARAMS)
+    except ValueError:
+        return True
+
+def calibrate_hash_params(target_ms: float = 250.0, algorithm: str = "pbkdf2_sha256") -> str:
+    """
+    Parameters whose verification takes about target_ms on this machine.
+    pbkdf2 scales rounds linearly from a timed sample (never below
+    PBKDF2_ROUNDS); scrypt doubles n (memory and time) until the target is
+    reached.
+    """
+    salt = os.urandom(16)
+    if algorithm == "pbkdf2_sha256":
+        sample = 20_000
+        start = time.perf_counter()
+        _derive("calibrate", salt, format_hash_params(algorithm, rounds=sample))
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        rounds = int(sample * target_ms / 1000.0 / elapsed)
+        return format_hash_params(algorithm, rounds=max(PBKDF2_ROUNDS, rounds // 1000 * 1000))
+    if algorithm == "scrypt":
+        n = 2 ** 12
+        while n < 2 ** 20:
+            params = format_hash_params(algorithm, n=n, r=8, p=1)
+            start = time.perf_counter()
+            _derive("calibrate", salt, params)
+            if (time.perf_counter() - start) * 1000.0 >= target_ms:
+                break
+            n *= 2
+        return format_hash_params(algorithm, n=n, r=8, p=1)
+    raise ValueError(f"Unknown password hash algorithm {algorithm!r}")
+
+# fail at startup, not at the first login, on a bad RESORT_HASH_PARAMS
+try:
+    parse_hash_params(HASH_PARAMS)
+except ValueError as e:
+    raise ValueError(f"Invalid RESORT_HASH_PARAMS {HASH_PARAMS!r}: {e}") from None
 
 def try_int_or_zero(text: str) -> int:
     """Safely converts a string to an integer, returning 0 on failure."""
@@ -2,16 +2,19 @@ import customtkinter as ctk
 from tkinter import messagebox
 import resort_theme as theme
 from controllers import BookingController, AdminController
-from models import TableModel, RoomModel, find_user, create_user, BookingModel
+from models import TableModel, RoomModel, create_user, BookingModel, availability_map
 from ctk_multiselect import CTkMultiSelectDropdown
-import pandas as pd
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import utils
+import auth
+import math
+import queue
+import threading
+import scheduler
+from ui_tasks import LatestOnly, TaskExecutor
+from tree_grid import GridUpdater, VirtualGrid
 import tkinter as tk
 import tkinter.ttk as ttk
-from datetime import datetime, timedelta
-from PIL import Image, ImageTk
+from datetime import datetime
 
 
 # Global Constants for GUI Standardization
@@ -20,6 +23,39 @@ FRAME_PADX = 20
 FRAME_PADY = 15
 
 
+def graph_backend():
+    """
+    matplotlib's Figure and Tk canvas classes. Imported on first use so the
+    login window does not wait for matplotlib; see prewarm_graph_backend().
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
+
+
+def prewarm_graph_backend():
+    """Import the graph backend on a daemon thread so the first admin graph opens quickly."""
+    def load():
+        try:
+            graph_backend()
+        except Exception as e:
+            print(f"Graph backend pre-load failed: {e}")
+    threading.Thread(target=load, name="resort-prewarm", daemon=True).start()
+
+
+def busy_button(button, busy_text):
+    """busy callback for TaskExecutor.submit(): disables button and swaps its label while working."""
+    idle_text = button.cget('text')
+
+    def set_busy(busy):
+        try:
+            button.configure(state='disabled' if busy else 'normal', text=busy_text if busy else idle_text)
+        except Exception:
+            pass  # widget already destroyed
+
+    return set_busy
+
+
 def style_ctk(widget, bg=None, fg=None):
     try:
         if bg is not None:
@@ -38,6 +74,11 @@ class LoginWindow(ctk.CTk):
         self.title('Resort Login')
         self.geometry('520x360')
         style_ctk(self, bg=theme.BG)
+        # password hashing runs on one worker: the window stays responsive and
+        # at most one attempt is hashed at a time
+        self.tasks = TaskExecutor(self, max_workers=1)
+        self.throttle = auth.LoginThrottle()
+        self._login_task = None
         self.build()
 
     def build(self):
@@ -70,31 +111,54 @@ class LoginWindow(ctk.CTk):
         btnf = ctk.CTkFrame(body, fg_color='transparent')
         btnf.pack(fill='x', padx=8, pady=(6, 0))
 
-        login_btn = ctk.CTkButton(btnf, text='Login', command=self.login, width=120, corner_radius=8)
-        login_btn.pack(padx=6)
-        style_ctk(login_btn, bg=theme.PRIMARY, fg=theme.PANEL)
+        self.login_btn = ctk.CTkButton(btnf, text='Login', command=self.login, width=120, corner_radius=8)
+        self.login_btn.pack(padx=6)
+        style_ctk(self.login_btn, bg=theme.PRIMARY, fg=theme.PANEL)
 
     def login(self):
+        if self._login_task:
+            return  # an attempt is already being checked
         username = self.user_e.get().strip()
         password = self.pw_e.get().strip()
         if not username or not password:
             return messagebox.showwarning('Missing', 'Enter credentials')
-        r = find_user(username)
-        if not r:
-            return messagebox.showerror('Failed', 'Unknown user')
-        if utils.verify_password(password, r['salt'], r['password_hash']):
-            self.withdraw()
-            app = MainApp(self)
-            app.protocol('WM_DELETE_WINDOW', lambda: (app.destroy(), self.deiconify()))
-        else:
-            return messagebox.showerror('Failed', 'Wrong password')
+        wait = self.throttle.retry_after(username)
+        if wait > 0:
+            return messagebox.showwarning('Too many attempts',
+                                          f'Too many failed attempts. Try again in {math.ceil(wait)} seconds.')
+        self._login_task = self.tasks.submit(auth.authenticate, username, password,
+                                             on_done=lambda result: self.login_done(username, result),
+                                             on_error=self.login_failed,
+                                             busy=busy_button(self.login_btn, 'Checking...'))
+
+    def login_done(self, username, result):
+        self._login_task = None
+        user, error = result
+        if user is None:
+            self.throttle.failure(username)
+            return messagebox.showerror('Failed', error)
+        self.throttle.success(username)
+        self.pw_e.delete(0, 'end')
+        session = auth.sessions.issue(user)
+        self.withdraw()
+        app = MainApp(self, session.token)
+        app.protocol('WM_DELETE_WINDOW', lambda: (app.destroy(), self.deiconify()))
+
+    def login_failed(self, error):
+        self._login_task = None
+        messagebox.showerror('Failed', f'Login failed: {error}')
+
+    def destroy(self):
+        self.tasks.shutdown()
+        super().destroy()
 
 
 
 # MAIN APP WRAPPER
 class MainApp(ctk.CTkToplevel):
-    def __init__(self, login_window):
+    def __init__(self, login_window, session_token):
         super().__init__(login_window)
+        self.session_token = session_token
         self.title('Paradise Resort Management System')
         self.geometry('1200x760')
         style_ctk(self, bg=theme.BG)
@@ -142,21 +206,70 @@ class MainApp(ctk.CTkToplevel):
         self.content.pack(side='left', fill='both', expand=True, padx=(6, 12), pady=12)
         style_ctk(self.content, bg=theme.BG)
 
+        # database / report work for every view runs here, never on the Tk thread
+        self.tasks = TaskExecutor(self, max_workers=2,
+                                  on_busy=lambda busy: self.configure(cursor='watch' if busy else ''))
+
+        # housekeeping runs on a worker thread; results come back through a queue
+        self.scheduler = scheduler.build_scheduler()
+        self._warned_overdue = set()
+        self.scheduler.start()
+        self.after(1000, self.poll_jobs)
+
+        # logged in: load matplotlib now, off the Tk thread, before the graph is opened
+        prewarm_graph_backend()
+
         self.open_booking()
 
+    def poll_jobs(self):
+        while True:
+            try:
+                name, result, error, _elapsed = self.scheduler.results.get_nowait()
+            except queue.Empty:
+                break
+            if error:
+                print(f"Background job {name} failed: {error}")
+                continue
+            if name == 'overdue_checkouts':
+                self.warn_overdue(result)
+            elif name == 'reporting_rollup' and result:
+                print(f"Rollups had drifted in {result} bucket(s); rebuilt from bookings")
+        try:
+            self.after(1000, self.poll_jobs)
+        except Exception:
+            pass
+
+    def warn_overdue(self, overdue_ids):
+        # only nag about bookings that were not in the last warning
+        new_ids = [i for i in overdue_ids if i not in self._warned_overdue]
+        self._warned_overdue = set(overdue_ids)
+        if new_ids:
+            id_list = ", ".join(map(str, overdue_ids))
+            messagebox.showwarning("ACTION REQUIRED: Overdue Checkouts Detected!",
+                                   f"🚨 There are {len(overdue_ids)} Overnight booking(s) past the 8 AM cutoff.\nBooking IDs: {id_list}\nPlease review the 'Current Guests' filter and manually check them out.")
+
+    def destroy(self):
+        auth.sessions.revoke(self.session_token)
+        self.scheduler.stop(timeout=1.0)
+        self.tasks.shutdown()
+        super().destroy()
+
     def open_booking(self):
         for w in self.content.winfo_children():
             w.destroy()
         style_ctk(self.book_btn, bg=theme.PRIMARY, fg=theme.PANEL)
         style_ctk(self.admin_btn, bg=theme.PRIMARY_HOVER, fg=theme.PANEL)
-        BookingView(self.content, self.open_admin)
+        BookingView(self.content, self.open_admin, self.tasks)
 
     def open_admin(self):
+        # checked against the session issued at login; no password re-hash
+        if not auth.sessions.is_admin(self.session_token):
+            return messagebox.showerror('Access denied', 'Admin access requires an admin login.')
         for w in self.content.winfo_children():
             w.destroy()
         style_ctk(self.book_btn, bg=theme.PRIMARY_HOVER, fg=theme.PANEL)
         style_ctk(self.admin_btn, bg=theme.PRIMARY, fg=theme.PANEL)
-        AdminView(self.content)
+        AdminView(self.content, self.tasks)
 
     def logout(self):
         self.destroy()
@@ -164,11 +277,13 @@ class MainApp(ctk.CTkToplevel):
 
 # BOOKING VIEW
 class BookingView(ctk.CTkFrame):
-    def __init__(self, parent, open_admin_cb):
+    def __init__(self, parent, open_admin_cb, tasks):
         super().__init__(parent)
         self.parent = parent
         self.open_admin_cb = open_admin_cb
         self.ctrl = BookingController()
+        self.tasks = tasks
+        self._running = []
 
         self._tables = []
         self._rooms = []
@@ -186,6 +301,7 @@ class BookingView(ctk.CTkFrame):
         # RESORT BACKGROUND IMAGE
         # ---------------------------
         try:
+            from PIL import Image, ImageTk
             bg = Image.open("assets/resort_bg.jpg")
             bg = bg.resize((1400, 800), Image.LANCZOS)
             self.bg_photo = ImageTk.PhotoImage(bg)
@@ -558,13 +674,33 @@ class BookingView(ctk.CTkFrame):
                 pass
         self.update_totals_display()
 
-    def refresh_all(self):
-        date_today = datetime.now().strftime('%Y-%m-%d')
+    def run_task(self, func, *args, on_done=None, busy=None):
+        task = self.tasks.submit(func, *args, on_done=on_done, busy=busy,
+                                 on_error=lambda e: messagebox.showerror('Error', str(e)))
+        self._running = [t for t in self._running if not t.done] + [task]
+        return task
+
+    def destroy(self):
+        # leaving the view: results that arrive later have nowhere to go
+        for task in self._running:
+            task.cancel()
+        super().destroy()
+
+    @staticmethod
+    def load_facilities(date_today):
         all_tables = TableModel.list_available()
         all_rooms = RoomModel.list_available()
-        available_tables = [t for t in all_tables if not TableModel.is_table_booked(t['id'], date_today)]
-        available_rooms = [r for r in all_rooms if not RoomModel.is_room_booked(r['id'], date_today)]
+        booked = availability_map(date_today)
+        available_tables = [t for t in all_tables if t['id'] not in booked['tables']]
+        available_rooms = [r for r in all_rooms if r['id'] not in booked['rooms']]
+        return available_tables, available_rooms
 
+    def refresh_all(self):
+        date_today = datetime.now().strftime('%Y-%m-%d')
+        self.run_task(self.load_facilities, date_today, on_done=self.show_facilities)
+
+    def show_facilities(self, result):
+        available_tables, available_rooms = result
         table_names = [f"{t['name']} (cap {t['capacity']}) — ₱{t['price']}" for t in available_tables]
         room_names = [f"{r['name']} (cap {r['capacity']}) — ₱{r['price']}" for r in available_rooms]
 
@@ -658,10 +794,6 @@ class BookingView(ctk.CTkFrame):
             if cap < guests:
                 return messagebox.showwarning('Capacity', f"Rooms capacity {cap} < guests {guests}.")
 
-        ok, msg = self.ctrl.validate_availability(date, table_ids or None, room_ids or None)
-        if not ok:
-            return messagebox.showerror('Unavailable', msg)
-
         try:
             table_fee = float(self.table_fee.get() or 0)
             room_fee = float(self.room_fee.get() or 0)
@@ -669,11 +801,20 @@ class BookingView(ctk.CTkFrame):
         except:
             return messagebox.showerror('Error', 'Invalid fee totals.')
 
-        try:
-            self.ctrl.create_booking(name, date, a, c, pkg, table_ids or None, room_ids or None, table_fee, room_fee,
-                                     total, total)
-        except Exception as e:
-            return messagebox.showerror('Error', str(e))
+        def save():
+            ok, msg = self.ctrl.validate_availability(date, table_ids or None, room_ids or None)
+            if ok:
+                self.ctrl.create_booking(name, date, a, c, pkg, table_ids or None, room_ids or None, table_fee,
+                                         room_fee, total, total)
+            return ok, msg
+
+        self.run_task(save, on_done=lambda res: self.booking_saved(res, name, guests),
+                      busy=busy_button(self.register_btn, 'Saving…'))
+
+    def booking_saved(self, result, name, guests):
+        ok, msg = result
+        if not ok:
+            return messagebox.showerror('Unavailable', msg)
 
         messagebox.showinfo('OK', f'Checked-in {name} ({guests} guests)')
         self.name.delete(0, 'end')
@@ -687,9 +828,11 @@ class BookingView(ctk.CTkFrame):
 
 
 class CreateUserDialog(ctk.CTkToplevel):
-    def __init__(self, parent, controller):
+    def __init__(self, parent, controller, tasks):
         super().__init__(parent)
         self.controller = controller
+        self.tasks = tasks
+        self._create_task = None
         self.title("Create New Account")
         self.geometry("400x450")
         self.transient(parent)
@@ -723,44 +866,85 @@ class CreateUserDialog(ctk.CTkToplevel):
         cancel_btn = ctk.CTkButton(btn_frame, text="Cancel", command=self.destroy, width=100, fg_color=theme.BORDER,
                                    text_color=theme.TEXT)
         cancel_btn.pack(side='left', padx=5)
-        create_btn = ctk.CTkButton(btn_frame, text="Create Account", command=self.submit, width=140)
-        create_btn.pack(side='right', padx=5)
-        style_ctk(create_btn, bg=theme.PRIMARY, fg=theme.PANEL)
+        self.create_btn = ctk.CTkButton(btn_frame, text="Create Account", command=self.submit, width=140)
+        self.create_btn.pack(side='right', padx=5)
+        style_ctk(self.create_btn, bg=theme.PRIMARY, fg=theme.PANEL)
 
     def submit(self):
+        if self._create_task:
+            return  # the account is already being created
         user = self.user_entry.get().strip()
         pw = self.pass_entry.get().strip()
         confirm = self.confirm_entry.get().strip()
         if pw != confirm:
             messagebox.showerror("Error", "Passwords do not match.")
             return
-        success, msg = self.controller.create_account(user, pw)
+        # hashing the password is deliberately slow; keep it off the Tk thread
+        self._create_task = self.tasks.submit(self.controller.create_account, user, pw,
+                                              on_done=self.create_done, on_error=self.create_failed,
+                                              busy=busy_button(self.create_btn, "Creating..."))
+
+    def create_done(self, result):
+        self._create_task = None
+        success, msg = result
         if success:
             messagebox.showinfo("Success", msg)
             self.destroy()
         else:
             messagebox.showerror("Failed", msg)
 
+    def create_failed(self, error):
+        self._create_task = None
+        messagebox.showerror("Failed", f"Could not create account: {error}")
+
+    def destroy(self):
+        if self._create_task:
+            self._create_task.cancel()
+        super().destroy()
+
 
 # ADMIN VIEW (FIXED)
 class AdminView(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, tasks):
         super().__init__(parent)
         self.ctrl = AdminController()  # <--- Corrected Here
+        self.tasks = tasks
+        self._running = []
 
-        self.after(500, self.check_for_overdue_warning)
         self.graph_frame = None
         self.canvas_widget = None
+        # one figure/canvas per shown graph; redraws update the bars in place
+        self.figure = self.ax = self.canvas = None
+        self.bars = None
+        self.bar_labels = None
         self.graph_visible = False
         self.filter_var = ctk.StringVar(value="Current Guests")
         self.search_var = ctk.StringVar()
         self.graph_type_var = ctk.StringVar(value="Daily")
 
+        # searches run on a worker; only the newest result reaches the grid
+        self.search_runner = LatestOnly(self, self.show_bookings, delay_ms=250,
+                                        on_error=lambda e: print(f"Booking search failed: {e}"),
+                                        executor=tasks)
+        self.graph_task = None
+
         self.pack(fill='both', expand=True)
         style_ctk(self, bg=theme.BG)
         self.build()
         self.load_bookings()
 
+    def destroy(self):
+        self.search_runner.cancel()
+        for task in self._running:
+            task.cancel()
+        super().destroy()
+
+    def run_task(self, func, *args, on_done=None, busy=None):
+        task = self.tasks.submit(func, *args, on_done=on_done, busy=busy,
+                                 on_error=lambda e: messagebox.showerror('Error', str(e)))
+        self._running = [t for t in self._running if not t.done] + [task]
+        return task
+
     def _build_top_controls(self):
         top = ctk.CTkFrame(self, fg_color=theme.PANEL, corner_radius=12)
         top.pack(fill='x', pady=(10, 8), padx=10)
@@ -780,7 +964,7 @@ class AdminView(ctk.CTkFrame):
         btn_row = ctk.CTkFrame(header_row, fg_color="transparent")
         btn_row.pack(side='right')
 
-        checkout_btn = ctk.CTkButton(
+        self.checkout_btn = checkout_btn = ctk.CTkButton(
             btn_row,
             text='Checkout Selection',
             width=150,
@@ -814,7 +998,7 @@ class AdminView(ctk.CTkFrame):
             textvariable=self.search_var
         )
         search_entry.pack(side='left')
-        search_entry.bind("<KeyRelease>", lambda e: self.load_bookings())
+        search_entry.bind("<KeyRelease>", lambda e: self.schedule_search())
 
         filter_seg = ctk.CTkSegmentedButton(
             ctrl_row,
@@ -928,6 +1112,12 @@ class AdminView(ctk.CTkFrame):
         self.tree.column("booking_date", width=110)
         self.tree.column("status", width=110)
 
+        # refreshes diff by booking id; very large results only materialise the visible rows
+        self.grid = VirtualGrid(self.tree, vsb, GridUpdater(self.tree, self.row_values, self.row_tags))
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(seq, self.grid.on_wheel)
+        self.tree.bind("<Configure>", lambda e: self.grid.on_resize(e, 34))
+
     def _build_graph_section(self, main_content):
         self.graph_frame = ctk.CTkFrame(
             main_content,
@@ -957,7 +1147,7 @@ class AdminView(ctk.CTkFrame):
         self._build_graph_section(main_content)
 
     def open_create_account(self):
-        CreateUserDialog(self, self.ctrl)
+        CreateUserDialog(self, self.ctrl, self.tasks)
 
     def checkout_selected(self):
         item = self.tree.selection()
@@ -969,69 +1159,53 @@ class AdminView(ctk.CTkFrame):
         if status != 'checked-in':
             return messagebox.showerror('Invalid', 'Only checked-in bookings can be checked out.')
         if messagebox.askyesno("Confirm", f"Checkout guest '{values[1]}' (ID: {bid})?"):
-            self.ctrl.checkout(bid)
-            messagebox.showinfo('OK', 'Guest checked out successfully.')
-            self.load_bookings()
+            self.run_task(self.ctrl.checkout, bid, on_done=self.checked_out,
+                          busy=busy_button(self.checkout_btn, 'Checking out…'))
 
-    def check_for_overdue_warning(self):
-        try:
-            overdue_ids = self.ctrl.check_auto_checkout()
-        except Exception as e:
-            print(f"Error checking for overdue guests: {e}")
-            return
-        if overdue_ids:
-            id_list = ", ".join(map(str, overdue_ids))
-            messagebox.showwarning("ACTION REQUIRED: Overdue Checkouts Detected!",
-                                   f"🚨 There are {len(overdue_ids)} Overnight booking(s) past the 8 AM cutoff.\nBooking IDs: {id_list}\nPlease review the 'Current Guests' filter and manually check them out.")
+    def checked_out(self, _result):
+        messagebox.showinfo('OK', 'Guest checked out successfully.')
+        self.load_bookings()
 
     def check_overdue(self, r):
         if r['status'] != 'checked-in':
             return False
+        due = r['expected_checkout_at']  # only set for Overnight / Complete Stay
+        return isinstance(due, datetime) and datetime.now() >= due
 
-        if r['package'].lower() not in ('overnight', 'complete stay'):
-            return False
-
-        try:
-            b_date = datetime.strptime(r['booking_date'], "%Y-%m-%d").date()
-            deadline = datetime.combine(b_date + timedelta(days=1), datetime.min.time().replace(hour=8))
-            return datetime.now() >= deadline
-        except Exception:
-            return False
+    def schedule_search(self, delay_ms=None):
+        self.search_runner.submit(self.ctrl.search_bookings, self.search_var.get(), self.filter_var.get(),
+                                  delay_ms=delay_ms)
 
     def load_bookings(self, *args):
-        all_rows = self.ctrl.report_all()
-        search_txt = self.search_var.get().lower()
-        mode = self.filter_var.get()
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        self.tree.delete(*self.tree.get_children())
-        for r in all_rows:
-            g_name = r['guest_name'].lower()
-            if search_txt and search_txt not in g_name: continue
-            if mode == "Current Guests" and r['status'] != 'checked-in':
-                continue
-            elif mode == "Today's Arrivals" and r['booking_date'] != today_str:
-                continue
-
-            row_tag = 'evenrow' if len(self.tree.get_children()) % 2 == 0 else 'oddrow'
-            if self.check_overdue(r):
-                tags = ('overdue',)
-            else:
-                tags = (row_tag,)
-
-            checkin_time = r['checkin_time'] if r['checkin_time'] else ""
-            guest_count = r['guest_count']
-            table_id = r['table_id'] if r['table_id'] else "None"
-            room_id = r['room_id'] if r['room_id'] else "None"
+        # filter switches, checkouts and the first load skip the typing debounce
+        self.schedule_search(delay_ms=0)
 
-            self.tree.insert('', 'end', values=[r['id'], r['guest_name'], r['booking_date'], checkin_time, r['adults'],
-                                                r['children'], guest_count, r['package'], table_id, room_id,
-                                                r['total_amount'], r['amount_paid'], r['status']], tags=tags)
+    def show_bookings(self, rows):
+        if not self.winfo_exists():
+            return
+        self.grid.set_rows(rows)
+
+    def row_tags(self, r, index):
+        if self.check_overdue(r):
+            return ('overdue',)
+        return ('evenrow',) if index % 2 == 0 else ('oddrow',)
+
+    @staticmethod
+    def row_values(r):
+        checkin_time = r['checkin_time'] if r['checkin_time'] else ""
+        table_id = r['table_id'] if r['table_id'] else "None"
+        room_id = r['room_id'] if r['room_id'] else "None"
+        return [r['id'], r['guest_name'], r['booking_date'], checkin_time, r['adults'], r['children'],
+                r['guest_count'], r['package'], table_id, room_id, r['total_amount'], r['amount_paid'],
+                r['status']]
 
     def toggle_daily_graph(self):
         if self.graph_visible:
             if self.canvas_widget:
                 self.canvas_widget.destroy()
                 self.canvas_widget = None
+            self.figure = self.ax = self.canvas = None
+            self.bars = self.bar_labels = None
             for w in self.graph_frame.winfo_children(): w.destroy()
             ctk.CTkLabel(self.graph_frame, text="Graph Area\n(Press 'Show Graph' to view)",
                          text_color=theme.MUTED).pack(expand=True)
@@ -1044,56 +1218,71 @@ class AdminView(ctk.CTkFrame):
             seg = ctk.CTkSegmentedButton(ctrl_frame, values=["Daily", "Monthly"], variable=self.graph_type_var,
                                          command=lambda v: self.open_graph())
             seg.pack(pady=5)
+            self.graph_visible = True
             self.open_graph()
             self.graph_btn.configure(text='Hide Graph')
-            self.graph_visible = True
 
-    def _create_summary_plot(self, df, mode="Daily"):
+    def _create_summary_plot(self):
+        Figure, _ = graph_backend()
         fig = Figure(figsize=(8, 5), dpi=100)
-        ax = fig.add_subplot(111)
-        for col in ('adults', 'children'):
-            if col not in df.columns: df[col] = 0
-        df['adults'] = pd.to_numeric(df['adults'], errors='coerce').fillna(0)
-        df['children'] = pd.to_numeric(df['children'], errors='coerce').fillna(0)
-        df['guest_count'] = df['adults'] + df['children']
-        df['booking_date'] = pd.to_datetime(df['booking_date'])
+        fig.set_facecolor(theme.PANEL)
+        return fig, fig.add_subplot(111)
 
-        if mode == "Monthly":
-            df['period'] = df['booking_date'].dt.to_period('M').astype(str)
-            summary = df.groupby('period')['guest_count'].sum().reset_index()
-            x_col = 'period'
-            title = "Total Guests Per Month"
-            xlabel = "Month"
-        else:
-            summary = df.groupby('booking_date')['guest_count'].sum().reset_index()
-            summary = summary.sort_values(by='booking_date')
-            summary['date_str'] = summary['booking_date'].dt.strftime('%m-%d')
-            x_col = 'date_str'
-            title = "Guests Checked In Per Day"
-            xlabel = "Date"
-
-        ax.bar(summary[x_col], summary['guest_count'], color=theme.PRIMARY)
+    def _plot_summary(self, labels, guests, title, xlabel):
+        ax = self.ax
+        ax.clear()
+        self.bars = ax.bar(labels, guests, color=theme.PRIMARY)
+        self.bar_labels = list(labels)
         ax.set_title(title, fontsize=12, fontweight='bold', color=theme.TEXT)
         ax.set_xlabel(xlabel, color=theme.MUTED)
         ax.set_ylabel('Total Guests', color=theme.MUTED)
         ax.grid(axis='y', linestyle='--', alpha=0.7)
-        fig.set_facecolor(theme.PANEL)
         ax.set_facecolor(theme.CARD)
-        fig.autofmt_xdate(rotation=45)
-        return fig
+        self.figure.autofmt_xdate(rotation=45)
+
+    @staticmethod
+    def graph_summary(mode, data):
+        labels, guests = data
+        if not labels:
+            return None
+        if mode == "Monthly":
+            return labels, guests, "Total Guests Per Month", "Month"
+        return labels, guests, "Guests Checked In Per Day", "Date"
+
+    @staticmethod
+    def load_graph_data(ctrl, mode):
+        return AdminView.graph_summary(mode, ctrl.guest_summary(mode))
 
     def open_graph(self):
-        rows = self.ctrl.report_all()
-        if not rows: return
-        try:
-            clean_rows = [dict(r) for r in rows]
-            df = pd.DataFrame(clean_rows)
-        except Exception:
-            return
+        # a newer Daily/Monthly click replaces one still loading
+        if self.graph_task:
+            self.graph_task.cancel()
+            self.graph_task = None
         mode = self.graph_type_var.get()
-        fig = self._create_summary_plot(df, mode)
-        if self.canvas_widget: self.canvas_widget.destroy()
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-        canvas.draw()
-        self.canvas_widget = canvas.get_tk_widget()
-        self.canvas_widget.pack(fill='both', expand=True, padx=5, pady=5)
\ No newline at end of file
+        cached = self.ctrl.cached_guest_summary(mode)
+        if cached is not None:
+            # bookings unchanged since the last load: no worker round trip
+            self.draw_graph(self.graph_summary(mode, cached))
+            return
+        self.graph_task = self.run_task(self.load_graph_data, self.ctrl, mode, on_done=self.draw_graph)
+
+    def draw_graph(self, summary):
+        if summary is None or not self.graph_visible:
+            return
+        labels, guests, title, xlabel = summary
+        if self.canvas is None:
+            self.figure, self.ax = self._create_summary_plot()
+            _, FigureCanvasTkAgg = graph_backend()
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.graph_frame)
+            self.canvas_widget = self.canvas.get_tk_widget()
+            self.canvas_widget.pack(fill='both', expand=True, padx=5, pady=5)
+            self._plot_summary(labels, guests, title, xlabel)
+        elif self.bar_labels == list(labels) and self.ax.get_title() == title:
+            # same buckets: move the bar tops rather than rebuilding the axes
+            for bar, value in zip(self.bars, guests):
+                bar.set_height(value)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        else:
+            self._plot_summary(labels, guests, title, xlabel)
+        self.canvas.draw_idle()